@@ -1,25 +1,88 @@
 #!/usr/bin/env python3
-import argparse
+import functools
 import json
 import os
 import re
 import sqlite3
 import sys
-import warnings
+from types import SimpleNamespace
 from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
 
-warnings.filterwarnings(
-    "ignore",
-    category=DeprecationWarning,
-    message=r"Parsing dates involving a day of month without a year specified.*",
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    try:
+        import ujson
+    except ImportError:
+        ujson = None
+
+if orjson is not None:
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+elif ujson is not None:
+    def _loads(data):
+        return ujson.loads(data)
+
+    def _dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=True)
+else:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=True)
+
+_PERCENT_RE = re.compile(r"(\d{1,3})\s*%")
+_RELATIVE_RE = re.compile(r"^in\s+(?:(\d+)\s*hr?)?\s*(?:(\d+)\s*min)?", re.IGNORECASE)
+_WEEKDAY_RE = re.compile(
+    r"^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d{1,2}):(\d{2})\s*(AM|PM)", re.IGNORECASE
+)
+_TZ_RE = re.compile(r"^(.*)\s+\(([^)]+)\)\s*$")
+# CLI reset formats: "Jan 1, 2026, 9:59am", "Jan 1, 9am", "9:59am", "9am"
+_RESETS_RE = re.compile(
+    r"^(?:(?P<mon>[a-z]{3})\s+(?P<day>\d{1,2}),\s+(?:(?P<year>\d{4}),\s+)?)?"
+    r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?(?P<ampm>am|pm)$",
+    re.IGNORECASE,
 )
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_WEEKDAYS = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+_AMPM_OFFSET = {"am": 0, "pm": 12}
+
+
+@functools.lru_cache(maxsize=32)
+def _zoneinfo(name):
+    # Imported lazily: most reset strings carry no explicit zone.
+    from zoneinfo import ZoneInfo
+
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
 
 
+def _to_24h(hour, ampm):
+    return hour % 12 + _AMPM_OFFSET[ampm.lower()]
+
+
+@functools.lru_cache(maxsize=64)
 def parse_used_percent(raw_value):
     if not raw_value:
         return None
-    match = re.search(r"(\d{1,3})\s*%", raw_value)
+    # Fast path for the common "NN%" / "NN% used" shape
+    head, sep, _ = raw_value.partition("%")
+    if not sep:
+        return None
+    digits = head.strip()
+    if 0 < len(digits) <= 3 and digits.isdecimal():
+        return int(digits)
+    match = _PERCENT_RE.search(raw_value)
     if not match:
         return None
     return int(match.group(1))
@@ -30,109 +93,120 @@ def parse_resets_timestamp(raw_value, reference_dt):
         return (None, None, None, None)
 
     text = raw_value.strip()
-    tz_name = None
 
-    # Handle web format: "in X hr Y min" or "in X min"
-    match_relative = re.match(r"^in\s+(?:(\d+)\s*hr?)?\s*(?:(\d+)\s*min)?", text, re.IGNORECASE)
+    # Handle web format: "in X hr Y min" or "in X min"; relative to the exact
+    # reference time, so never cached
+    match_relative = _RELATIVE_RE.match(text)
     if match_relative:
         hours = int(match_relative.group(1)) if match_relative.group(1) else 0
         minutes = int(match_relative.group(2)) if match_relative.group(2) else 0
         dt = reference_dt + timedelta(hours=hours, minutes=minutes)
-        dt = (dt + timedelta(minutes=30)).replace(minute=0, second=0, microsecond=0)
-        dt_utc = dt.astimezone(timezone.utc)
-        tz_name = str(reference_dt.tzinfo)
-        return (dt.isoformat(), dt_utc.isoformat(), int(dt_utc.timestamp()), tz_name)
+        return _reset_fields(dt, str(reference_dt.tzinfo))
+
+    # The other formats only depend on the reference date and zone; the name
+    # is part of the key because timezones with equal offsets compare equal.
+    dt, rollover, tz_name = _parse_anchored_resets(
+        text, reference_dt.date(), reference_dt.tzinfo, str(reference_dt.tzinfo)
+    )
+    if dt is None:
+        return (None, None, None, tz_name)
 
+    if rollover == "day" and dt < reference_dt:
+        dt = dt + timedelta(days=1)
+    elif rollover == "year" and dt < reference_dt:
+        dt = dt.replace(year=reference_dt.year + 1)
+    return _reset_fields(dt, tz_name)
+
+
+def _reset_fields(dt, tz_name):
+    """Round to the nearest hour and return (local iso, utc iso, epoch, tz)."""
+    dt = (dt + timedelta(minutes=30)).replace(minute=0, second=0, microsecond=0)
+    dt_utc = dt.astimezone(timezone.utc)
+    return (dt.isoformat(), dt_utc.isoformat(), int(dt_utc.timestamp()), tz_name)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_anchored_resets(text, reference_date, reference_tz, reference_tz_name):
+    """Parse a weekday or CLI reset string against a reference date.
+
+    Returns (aware datetime or None, rollover, tz_name); rollover says whether
+    a time already past the reference moves to the next "day" or "year", which
+    the caller decides with the exact reference time.
+    """
     # Handle web format: "Mon 12:00 PM", "Tue 11:59 PM"
-    match_weekday = re.match(r"^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d{1,2}):(\d{2})\s*(AM|PM)", text, re.IGNORECASE)
+    match_weekday = _WEEKDAY_RE.match(text)
     if match_weekday:
         weekday_abbr = match_weekday.group(1)
         hour = int(match_weekday.group(2))
         minute = int(match_weekday.group(3))
-        ampm = match_weekday.group(4).upper()
-
-        if ampm == "PM" and hour != 12:
-            hour += 12
-        elif ampm == "AM" and hour == 12:
-            hour = 0
+        hour = _to_24h(hour, match_weekday.group(4))
 
         # Find next occurrence of this weekday
-        weekdays = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
-        target_weekday = weekdays[weekday_abbr]
-        current_weekday = reference_dt.weekday()
-        days_ahead = target_weekday - current_weekday
+        target_weekday = _WEEKDAYS[weekday_abbr]
+        days_ahead = target_weekday - reference_date.weekday()
         if days_ahead <= 0:
             days_ahead += 7
 
-        dt = reference_dt + timedelta(days=days_ahead)
-        dt = dt.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        dt = (dt + timedelta(minutes=30)).replace(minute=0, second=0, microsecond=0)
-        dt_utc = dt.astimezone(timezone.utc)
-        tz_name = str(reference_dt.tzinfo)
-        return (dt.isoformat(), dt_utc.isoformat(), int(dt_utc.timestamp()), tz_name)
+        day = reference_date + timedelta(days=days_ahead)
+        dt = datetime(day.year, day.month, day.day, hour, minute, tzinfo=reference_tz)
+        return (dt, None, reference_tz_name)
+
+    tz_name = None
 
     # Handle CLI format: extract timezone from parentheses
-    match = re.match(r"^(.*)\s+\(([^)]+)\)\s*$", text)
+    match = _TZ_RE.match(text)
     if match:
         text = match.group(1).strip()
         tz_name = match.group(2).strip()
 
-    dt = None
-    has_date = False
-    has_year = False
-    for fmt, fmt_has_date, fmt_has_year in (
-        ("%b %d, %Y, %I:%M%p", True, True),
-        ("%b %d, %Y, %I%p", True, True),
-        ("%b %d, %I:%M%p", True, False),
-        ("%b %d, %I%p", True, False),
-        ("%I:%M%p", False, False),
-        ("%I%p", False, False),
-    ):
-        try:
-            dt = datetime.strptime(text, fmt)
-            has_date = fmt_has_date
-            has_year = fmt_has_year
-            break
-        except ValueError:
-            continue
-    if dt is None:
-        return (None, None, None, tz_name)
+    match = _RESETS_RE.match(text)
+    if not match:
+        return (None, None, tz_name)
+
+    hour = int(match.group("hour"))
+    minute = int(match.group("minute") or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        return (None, None, tz_name)
+    hour = _to_24h(hour, match.group("ampm"))
+
+    has_date = match.group("mon") is not None
+    has_year = match.group("year") is not None
+    if has_date:
+        month = _MONTHS.get(match.group("mon").lower())
+        if month is None:
+            return (None, None, tz_name)
+        year = int(match.group("year")) if has_year else reference_date.year
+        day = int(match.group("day"))
+    else:
+        year, month, day = reference_date.year, reference_date.month, reference_date.day
 
-    if not has_date:
-        dt = dt.replace(
-            year=reference_dt.year,
-            month=reference_dt.month,
-            day=reference_dt.day,
-        )
-    elif not has_year:
-        dt = dt.replace(year=reference_dt.year)
+    try:
+        dt = datetime(year, month, day, hour, minute)
+    except ValueError:
+        return (None, None, tz_name)
 
     if tz_name:
-        try:
-            tz = ZoneInfo(tz_name)
-        except Exception:
-            tz = None
+        tz = _zoneinfo(tz_name)
         if tz:
             dt = dt.replace(tzinfo=tz)
 
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=reference_dt.tzinfo)
+        dt = dt.replace(tzinfo=reference_tz)
 
-    if not has_date and dt < reference_dt:
-        dt = dt + timedelta(days=1)
-    elif not has_year and dt < reference_dt:
-        dt = dt.replace(year=reference_dt.year + 1)
-
-    dt = (dt + timedelta(minutes=30)).replace(minute=0, second=0, microsecond=0)
-
-    dt_utc = dt.astimezone(timezone.utc)
-    return (dt.isoformat(), dt_utc.isoformat(), int(dt_utc.timestamp()), tz_name)
+    if not has_date:
+        rollover = "day"
+    elif not has_year:
+        rollover = "year"
+    else:
+        rollover = None
+    return (dt, rollover, tz_name)
 
 
-def ensure_column(conn, table, column, definition):
-    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
-    if column not in columns:
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+def ensure_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, definition in columns:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
 
 
@@ -158,6 +232,50 @@ def build_usage_snapshot_key(
     return f"{email}|{session_key}|{week_key}"
 
 
+# Bump the suffix whenever ensure_schema gains a migration.
+SCHEMA_MARKER_SUFFIX = ".schema_v2"
+# Snapshot key of the newest row, so unchanged runs can exit without opening the DB.
+LAST_SNAPSHOT_SUFFIX = ".last_snapshot_key"
+
+
+def schema_is_current(db_path):
+    return os.path.exists(db_path) and os.path.exists(db_path + SCHEMA_MARKER_SUFFIX)
+
+
+def mark_schema_current(db_path):
+    try:
+        open(db_path + SCHEMA_MARKER_SUFFIX, "w").close()
+    except OSError:
+        pass
+
+
+def read_last_snapshot_marker(db_path):
+    try:
+        with open(db_path + LAST_SNAPSHOT_SUFFIX, "r", encoding="utf-8") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def write_last_snapshot_marker(db_path, usage_snapshot_key):
+    marker = db_path + LAST_SNAPSHOT_SUFFIX
+    tmp_marker = f"{marker}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_marker, "w", encoding="utf-8") as handle:
+            handle.write(usage_snapshot_key or "")
+        os.replace(tmp_marker, marker)
+    except OSError:
+        pass
+
+
+def configure_connection(conn):
+    # WAL + NORMAL sync: one fsync per commit instead of two, still crash-safe
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=134217728")
+
+
 def ensure_schema(conn):
     conn.execute(
         """
@@ -194,12 +312,18 @@ def ensure_schema(conn):
         "CREATE INDEX IF NOT EXISTS idx_cc_usage_events_email "
         "ON cc_usage_events(email)"
     )
-    ensure_column(conn, "cc_usage_events", "current_session_resets_raw", "TEXT")
-    ensure_column(conn, "cc_usage_events", "current_session_resets_local", "TEXT")
-    ensure_column(conn, "cc_usage_events", "current_session_resets_utc", "TEXT")
-    ensure_column(conn, "cc_usage_events", "current_session_resets_epoch", "INTEGER")
-    ensure_column(conn, "cc_usage_events", "current_session_resets_tz", "TEXT")
-    ensure_column(conn, "cc_usage_events", "usage_snapshot_key", "TEXT")
+    ensure_columns(
+        conn,
+        "cc_usage_events",
+        (
+            ("current_session_resets_raw", "TEXT"),
+            ("current_session_resets_local", "TEXT"),
+            ("current_session_resets_utc", "TEXT"),
+            ("current_session_resets_epoch", "INTEGER"),
+            ("current_session_resets_tz", "TEXT"),
+            ("usage_snapshot_key", "TEXT"),
+        ),
+    )
     try:
         conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_cc_usage_events_usage_snapshot ON cc_usage_events(usage_snapshot_key)")
     except sqlite3.IntegrityError:
@@ -207,70 +331,59 @@ def ensure_schema(conn):
     conn.commit()
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Log cc_usage JSON to SQLite.")
-    parser.add_argument(
-        "--db",
-        default=os.environ.get(
-            "CC_USAGE_DB_PATH",
-            os.path.join(os.path.expanduser("~"), ".claude", "db", "cc_usage.db"),
-        ),
-        help="SQLite database path",
+_INSERT_SQL = """
+    INSERT OR IGNORE INTO cc_usage_events (
+        captured_at_utc,
+        captured_at_local,
+        email,
+        current_session_used_pct,
+        current_session_used_raw,
+        current_session_resets_raw,
+        current_session_resets_local,
+        current_session_resets_utc,
+        current_session_resets_epoch,
+        current_session_resets_tz,
+        current_week_used_pct,
+        current_week_used_raw,
+        current_week_resets_raw,
+        current_week_resets_local,
+        current_week_resets_utc,
+        current_week_resets_epoch,
+        current_week_resets_tz,
+        usage_snapshot_key,
+        logfile,
+        raw_json
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def payload_snapshot_key(payload):
+    session = payload.get("current_session") or {}
+    week = payload.get("current_week_all_models") or {}
+    return build_usage_snapshot_key(
+        payload.get("email"),
+        parse_used_percent(session.get("used")),
+        session.get("used"),
+        parse_used_percent(week.get("used")),
+        week.get("used"),
     )
-    parser.add_argument("--input", help="Read JSON from a file path")
-    parser.add_argument("--json", help="Read JSON from a literal string")
-    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
-    args = parser.parse_args()
 
-    payload = None
-    if args.json:
-        try:
-            payload = json.loads(args.json)
-        except json.JSONDecodeError as exc:
-            print(f"Invalid JSON input: {exc}", file=sys.stderr)
-            return 2
-    elif args.input:
-        try:
-            with open(args.input, "r", encoding="utf-8") as handle:
-                payload = json.load(handle)
-        except (OSError, json.JSONDecodeError) as exc:
-            print(f"Invalid JSON input: {exc}", file=sys.stderr)
-            return 2
-    else:
-        if sys.stdin.isatty():
-            print(
-                "No JSON input provided. Use stdin, --input, or --json.",
-                file=sys.stderr,
-            )
-            return 2
-        data = sys.stdin.read()
-        if not data.strip():
-            print("Empty JSON input on stdin.", file=sys.stderr)
-            return 2
-        try:
-            payload = json.loads(data)
-        except json.JSONDecodeError as exc:
-            print(f"Invalid JSON input: {exc}", file=sys.stderr)
-            return 2
 
-    now_local = datetime.now().astimezone()
-    now_utc = now_local.astimezone(timezone.utc)
-
-    email = payload.get("email")
-    logfile = payload.get("logfile")
-
-    current_session_used_raw = (
-        payload.get("current_session", {}) or {}
-    ).get("used")
-    current_session_resets_raw = (
-        payload.get("current_session", {}) or {}
-    ).get("resets")
-    current_week_used_raw = (
-        payload.get("current_week_all_models", {}) or {}
-    ).get("used")
-    current_week_resets_raw = (
-        payload.get("current_week_all_models", {}) or {}
-    ).get("resets")
+def fetch_last_snapshot_key(conn):
+    row = conn.execute(
+        "SELECT usage_snapshot_key FROM cc_usage_events ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def build_event_row(payload, raw_text, usage_snapshot_key, now_local, captured_at):
+    """Build INSERT params; captured_at is the shared (utc_iso, local_iso) prefix."""
+    session = payload.get("current_session") or {}
+    week = payload.get("current_week_all_models") or {}
+    current_session_used_raw = session.get("used")
+    current_session_resets_raw = session.get("resets")
+    current_week_used_raw = week.get("used")
+    current_week_resets_raw = week.get("resets")
 
     current_session_used_pct = parse_used_percent(current_session_used_raw)
     current_week_used_pct = parse_used_percent(current_week_used_raw)
@@ -287,80 +400,349 @@ def main():
         current_week_resets_tz,
     ) = parse_resets_timestamp(current_week_resets_raw, now_local)
 
-    usage_snapshot_key = build_usage_snapshot_key(
-        email,
+    # Store the input text as received; only re-serialize when it is unavailable.
+    raw_json = raw_text.strip() if raw_text else _dumps(payload)
+
+    return captured_at + (
+        payload.get("email"),
         current_session_used_pct,
         current_session_used_raw,
+        current_session_resets_raw,
+        current_session_resets_local,
+        current_session_resets_utc,
+        current_session_resets_epoch,
+        current_session_resets_tz,
         current_week_used_pct,
         current_week_used_raw,
+        current_week_resets_raw,
+        current_week_resets_local,
+        current_week_resets_utc,
+        current_week_resets_epoch,
+        current_week_resets_tz,
+        usage_snapshot_key,
+        payload.get("logfile"),
+        raw_json,
     )
 
-    raw_json = json.dumps(payload, separators=(",", ":"), ensure_ascii=True)
 
-    db_dir = os.path.dirname(os.path.abspath(args.db))
-    if db_dir and not os.path.exists(db_dir):
+_DB_DIRS_ENSURED = set()
+
+
+def _ensure_db_dir(db_path):
+    db_dir = os.path.dirname(os.path.abspath(db_path))
+    if db_dir and db_dir not in _DB_DIRS_ENSURED:
         os.makedirs(db_dir, exist_ok=True)
+        _DB_DIRS_ENSURED.add(db_dir)
+
+
+def get_logger(db_path):
+    """Open a configured logger connection and the cursor reused for inserts."""
+    _ensure_db_dir(db_path)
 
-    with sqlite3.connect(args.db) as conn:
+    schema_current = schema_is_current(db_path)
+    # Autocommit mode; log_events issues its own BEGIN IMMEDIATE/COMMIT.
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    configure_connection(conn)
+    if not schema_current:
         ensure_schema(conn)
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO cc_usage_events (
-                captured_at_utc,
-                captured_at_local,
-                email,
-                current_session_used_pct,
-                current_session_used_raw,
-                current_session_resets_raw,
-                current_session_resets_local,
-                current_session_resets_utc,
-                current_session_resets_epoch,
-                current_session_resets_tz,
-                current_week_used_pct,
-                current_week_used_raw,
-                current_week_resets_raw,
-                current_week_resets_local,
-                current_week_resets_utc,
-                current_week_resets_epoch,
-                current_week_resets_tz,
-                usage_snapshot_key,
-                logfile,
-                raw_json
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                now_utc.isoformat(),
-                now_local.isoformat(),
-                email,
-                current_session_used_pct,
-                current_session_used_raw,
-                current_session_resets_raw,
-                current_session_resets_local,
-                current_session_resets_utc,
-                current_session_resets_epoch,
-                current_session_resets_tz,
-                current_week_used_pct,
-                current_week_used_raw,
-                current_week_resets_raw,
-                current_week_resets_local,
-                current_week_resets_utc,
-                current_week_resets_epoch,
-                current_week_resets_tz,
-                usage_snapshot_key,
-                logfile,
-                raw_json,
-            ),
-        )
-        conn.commit()
+        mark_schema_current(db_path)
+    return conn, conn.cursor()
 
-    if args.verbose:
-        print(
-            f"Logged usage for {email or 'unknown'} at {now_utc.isoformat()}",
-            file=sys.stderr,
-        )
 
+def log_events(conn, cursor, payloads, now_local, now_utc, raw_text=None):
+    """Insert payloads in one transaction; returns (logged, skipped, last_key)."""
+    logged = []
+    skipped = []
+
+    # Take the write lock up front so the last-key check and the insert see
+    # the same state and never need a lock upgrade.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Unchanged snapshots would be ignored by the unique index anyway; skip
+        # them before parsing reset times and attempting the write.
+        last_key = fetch_last_snapshot_key(conn)
+        captured_at = (now_utc.isoformat(), now_local.isoformat())
+        rows = []
+        for item in payloads:
+            usage_snapshot_key = payload_snapshot_key(item)
+            if usage_snapshot_key is not None and usage_snapshot_key == last_key:
+                skipped.append(item)
+                continue
+            rows.append(
+                build_event_row(item, raw_text, usage_snapshot_key, now_local, captured_at)
+            )
+            logged.append(item)
+            last_key = usage_snapshot_key
+
+        if rows:
+            cursor.executemany(_INSERT_SQL, rows)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return logged, skipped, last_key
+
+
+def record_payload(conn, cursor, db_path, payload, data, verbose):
+    """Log one decoded input (object or array) and refresh the snapshot marker."""
+    now_utc = datetime.now(timezone.utc)
+    # Resolved per call: a resident server lives across DST and zone changes
+    now_local = now_utc.astimezone()
+
+    # A JSON array logs several events with one connection and one commit.
+    if isinstance(payload, list):
+        payloads = payload
+        raw_text = None
+    else:
+        payloads = [payload]
+        raw_text = data
+
+    logged, skipped, last_key = log_events(
+        conn, cursor, payloads, now_local, now_utc, raw_text
+    )
+    write_last_snapshot_marker(db_path, last_key)
+
+    if verbose:
+        for item in logged:
+            print(
+                f"Logged usage for {item.get('email') or 'unknown'} at {now_utc.isoformat()}",
+                file=sys.stderr,
+            )
+        for item in skipped:
+            print(
+                f"Usage unchanged for {item.get('email') or 'unknown'}, nothing logged",
+                file=sys.stderr,
+            )
+
+
+def log_payload(db_path, data, verbose=False):
+    """Log one JSON document (object or array) to `db_path`; returns an exit status.
+
+    Also the in-process entry point used by cc_usage_web.py.
+    """
+    try:
+        payload = _loads(data)
+    except ValueError as exc:
+        print(f"Invalid JSON input: {exc}", file=sys.stderr)
+        return 2
+
+    if not isinstance(payload, list) and os.path.exists(db_path):
+        usage_snapshot_key = payload_snapshot_key(payload)
+        if (
+            usage_snapshot_key is not None
+            and read_last_snapshot_marker(db_path) == usage_snapshot_key
+        ):
+            if verbose:
+                print(
+                    f"Usage unchanged for {payload.get('email') or 'unknown'}, nothing logged",
+                    file=sys.stderr,
+                )
+            return 0
+
+    conn, cursor = get_logger(db_path)
+    try:
+        record_payload(conn, cursor, db_path, payload, data, verbose)
+    finally:
+        conn.close()
+
+    return 0
+
+
+# Seconds without a client before the resident logger exits.
+SERVER_IDLE_TIMEOUT = 900
+
+
+def serve(db_path, socket_path, verbose):
+    """Resident logger: newline-delimited JSON over a Unix socket, one warm DB
+    connection. Each connection opens with "DB <path>", refused unless it names
+    this server's database; every line is acknowledged with "ok" or "error"."""
+    import signal
+    import socket
+
+    db_realpath = os.path.realpath(db_path)
+
+    # Turn SIGTERM into SystemExit so the socket file is removed on the way out
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Owner-only from the moment the socket file exists
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    server.settimeout(SERVER_IDLE_TIMEOUT)
+
+    conn, cursor = get_logger(db_path)
+    try:
+        while True:
+            try:
+                client, _ = server.accept()
+            except socket.timeout:
+                break
+            client.settimeout(30)
+            try:
+                with client, client.makefile("rb") as reader:
+                    hello = reader.readline().decode("utf-8", "replace").strip()
+                    if (
+                        not hello.startswith("DB ")
+                        or os.path.realpath(hello[3:]) != db_realpath
+                    ):
+                        print(f"Refusing client for database {hello[3:]!r}", file=sys.stderr)
+                        client.sendall(b"error\n")
+                        continue
+                    client.sendall(b"ok\n")
+                    for line in reader:
+                        if not line.strip():
+                            continue
+                        try:
+                            text = line.decode("utf-8")
+                            record_payload(
+                                conn, cursor, db_path, _loads(text), text, verbose
+                            )
+                            reply = b"ok\n"
+                        except Exception as exc:
+                            print(f"Failed to log payload: {exc}", file=sys.stderr)
+                            reply = b"error\n"
+                        client.sendall(reply)
+            except OSError as exc:
+                print(f"Logger client error: {exc}", file=sys.stderr)
+    finally:
+        conn.close()
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
     return 0
 
 
+def default_socket_path(db_path):
+    """Socket of the resident logger for `db_path`, in a directory only this
+    user can reach: $XDG_RUNTIME_DIR, else a private directory in the temp dir."""
+    override = os.environ.get("CC_USAGE_LOGGER_SOCKET")
+    if override:
+        return override
+
+    import hashlib
+    import stat
+    import tempfile
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"cc_usage_logger-{os.getuid()}")
+        try:
+            os.mkdir(runtime_dir, 0o700)
+        except FileExistsError:
+            pass
+        # Someone else may have created it first; never use a directory we do not own
+        info = os.lstat(runtime_dir)
+        if (
+            not stat.S_ISDIR(info.st_mode)
+            or info.st_uid != os.getuid()
+            or info.st_mode & 0o077
+        ):
+            raise PermissionError(f"Unsafe logger socket directory: {runtime_dir}")
+
+    digest = hashlib.sha1(os.path.realpath(db_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(runtime_dir, f"cc_usage_logger-{digest}.sock")
+
+
+def default_db_path():
+    return os.environ.get(
+        "CC_USAGE_DB_PATH",
+        os.path.join(os.path.expanduser("~"), ".claude", "db", "cc_usage.db"),
+    )
+
+
+def parse_args_argparse(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Log cc_usage JSON to SQLite.")
+    parser.add_argument("--db", default=default_db_path(), help="SQLite database path")
+    parser.add_argument("--input", help="Read JSON from a file path")
+    parser.add_argument("--json", help="Read JSON from a literal string")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Stay resident and log JSON lines received on a Unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket path for --server (default: derived from the database path)",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_args(argv):
+    """Scan the few supported options by hand; argparse is only imported for
+    --help, errors, or anything else the fast scan does not recognise."""
+    options = {
+        "db": None,
+        "input": None,
+        "json": None,
+        "verbose": False,
+        "server": False,
+        "socket": None,
+    }
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--verbose", "--server"):
+            options[arg[2:]] = True
+            i += 1
+            continue
+        name, sep, value = arg.partition("=")
+        key = name[2:] if name.startswith("--") else None
+        if key not in ("db", "input", "json", "socket"):
+            return parse_args_argparse(argv)
+        if not sep:
+            if i + 1 >= len(argv) or argv[i + 1].startswith("-"):
+                return parse_args_argparse(argv)
+            value = argv[i + 1]
+            i += 1
+        options[key] = value
+        i += 1
+    if options["db"] is None:
+        options["db"] = default_db_path()
+    return SimpleNamespace(**options)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.server:
+        return serve(args.db, args.socket or default_socket_path(args.db), args.verbose)
+
+    if args.json:
+        data = args.json
+    elif args.input:
+        try:
+            with open(args.input, "r", encoding="utf-8") as handle:
+                data = handle.read()
+        except OSError as exc:
+            print(f"Invalid JSON input: {exc}", file=sys.stderr)
+            return 2
+    else:
+        if sys.stdin.isatty():
+            print(
+                "No JSON input provided. Use stdin, --input, or --json.",
+                file=sys.stderr,
+            )
+            return 2
+        data = sys.stdin.read()
+        if not data.strip():
+            print("Empty JSON input on stdin.", file=sys.stderr)
+            return 2
+
+    return log_payload(args.db, data, args.verbose)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
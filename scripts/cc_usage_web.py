@@ -1,67 +1,252 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import base64
+import functools
 import html
+import io
 import json
 import logging
 import os
+import queue
 import re
+import shutil
+import signal
+import socket
+import stat
 import subprocess
 import sys
+import threading
 import time
 import traceback
 from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import urlparse
 
-import requests
-from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
-from selenium.webdriver.common.by import By
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Load environment variables from .env file
-load_dotenv()
+if orjson is not None:
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj, indent=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+else:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj, indent=False):
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=True)
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=True)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Load environment variables from .env file; dotenv is only imported when one
+# exists in the script directory or a parent (where find_dotenv would look)
+for _env_dir in (SCRIPT_DIR, *SCRIPT_DIR.parents):
+    if (_env_dir / ".env").is_file():
+        from dotenv import load_dotenv
+
+        load_dotenv(_env_dir / ".env")
+        break
 
 DEFAULT_CDP_ENDPOINT = "http://localhost:9222"
 DEFAULT_EMAIL_URL = "https://claude.ai/settings/general"
 DEFAULT_USAGE_URL = "https://claude.ai/settings/usage"
 DEFAULT_EMAIL_LABEL = "What should Claude call you?"
 DEFAULT_OUTDIR = "/tmp/claude-stats"
+DEFAULT_LOGGER_PATH = str(SCRIPT_DIR / "cc_usage_logger.py")
+DEFAULT_DB_PATH = str(Path.home() / ".claude" / "db" / "cc_usage.db")
 DEFAULT_CHROME_PROFILE = os.path.expanduser("~/DEV/ms-playwright/claude")
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+CHROME_CACHE_DIR = "/tmp/chrome-cache"
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+# Anti-detection overrides applied to every page
+STEALTH_SCRIPTS = (
+    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})",
+    "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})",
+    "Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})",
+    "Object.defineProperty(navigator, 'permissions', {get: () => undefined})",
+    "window.chrome = { runtime: {} }",
+)
+
+# Heavy assets and trackers the scrape never needs (Network.setBlockedURLs patterns)
+BLOCKED_URL_PATTERNS = [
+    "*.woff2",
+    "*.woff",
+    "*.ttf",
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.webp",
+    "*.gif",
+    "*.svg",
+    "*.mp4",
+    "*.webm",
+    "*google-analytics*",
+    "*googletagmanager*",
+    "*segment.io*",
+    "*segment.com*",
+]
+
+# Playwright resource types aborted in CDP mode
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+# Chrome switches that skip background work and rendering the scrape never uses
+CHROME_SPEED_FLAGS = (
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-ipc-flooding-protection",
+    "--disable-features=TranslateUI,BlinkGenPropertyTrees",
+    "--hide-scrollbars",
+    "--mute-audio",
+    "--dns-prefetch-disable",
+)
+# Headless only: the visible login window keeps images (captchas, sign-in buttons)
+HEADLESS_SPEED_FLAGS = ("--blink-settings=imagesEnabled=false",)
 
 # Telegram notification setup
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 API_BASE = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}" if TELEGRAM_TOKEN else None
 
+_TG_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# HTTP clients are built (and their libraries imported) on the first send
+_TG_SESSION = None
+_TG_HTTPX = None
+
+
+def _tg_session():
+    """Keep-alive requests session; 429/5xx responses (Telegram rate limits)
+    are retried inside the adapter."""
+    global _TG_SESSION
+    if _TG_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        _TG_SESSION = requests.Session()
+        _TG_SESSION.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=1,
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.2,
+                    status_forcelist=sorted(_TG_RETRY_STATUSES),
+                    allowed_methods=frozenset({"POST"}),
+                    raise_on_status=False,
+                ),
+            ),
+        )
+    return _TG_SESSION
+
+
+def _tg_httpx_client():
+    """HTTP/2 httpx client when httpx[http2] is installed, else False."""
+    global _TG_HTTPX
+    if _TG_HTTPX is None:
+        try:
+            import httpx
+            import h2  # noqa: F401 - required by httpx for http2=True
+        except ImportError:
+            _TG_HTTPX = False
+        else:
+            _TG_HTTPX = httpx.Client(
+                http2=True,
+                timeout=5.0,
+                transport=httpx.HTTPTransport(http2=True, retries=2),
+            )
+    return _TG_HTTPX
+
+
+def _tg_post(url, **kwargs):
+    """POST to Telegram; queued messages are multiplexed on one HTTP/2
+    connection when possible, with the same 429/5xx retries either way."""
+    client = _tg_httpx_client()
+    if not client:
+        return _tg_session().post(url, **kwargs)
+    # httpx takes a raw body as content=; its data= is for form fields only
+    if isinstance(kwargs.get("data"), bytes):
+        kwargs["content"] = kwargs.pop("data")
+    for attempt in range(3):
+        r = client.post(url, **kwargs)
+        if r.status_code not in _TG_RETRY_STATUSES or attempt == 2:
+            return r
+        time.sleep(0.2 * (2 ** attempt))
+
+_PERCENT_USED_RE = re.compile(r"\b\d{1,3}%\s*used\b")
+_RESETS_PREFIX = "Resets "
+_RESETS_PREFIX_LEN = len(_RESETS_PREFIX)
+_RELATIVE_RE = re.compile(r"^in\s+(?:(\d+)\s*hr?)?\s*(?:(\d+)\s*min)?", re.IGNORECASE)
+_WEEKDAY_RE = re.compile(
+    r"^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d{1,2}):(\d{2})\s*(AM|PM)", re.IGNORECASE
+)
+_WEEKDAY_INDEX = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+_MONTH_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Parser section each header line switches to; "weekly_pending" waits for the
+# "All models" line before the weekly fields are read.
+_SECTION_HEADERS = {
+    "Current session": "session",
+    "Weekly limits": "weekly_pending",
+}
+_WEEKLY_SECTIONS = frozenset(("weekly", "weekly_pending"))
+# (used field, resets field) filled by the data lines of each section
+_SECTION_FIELDS = {
+    "session": ("session_used", "session_resets"),
+    "weekly": ("weekly_used", "weekly_resets"),
+}
+# Every line that opens a section contains one of these
+_SECTION_MARKERS = ("Current session", "Weekly limits", "Current week")
+
+# PID of the background Chrome kept alive between runs for CDP scraping
+CHROME_PID_FILE = Path("/tmp/cc_usage_chrome.pid")
+
 # State tracking: alert only on state changes (error -> ok, ok -> error)
 STATE_FILE = Path("/tmp/cc_usage_web_state.json")
 
 
-def _chunks(s: str, n: int):
-    """Split string into chunks of size n."""
-    for i in range(0, len(s), n):
-        yield s[i : i + n]
+_STATE_CACHE = None
 
 
 def load_state():
-    """Load previous state from file."""
-    try:
-        if STATE_FILE.exists():
-            return json.loads(STATE_FILE.read_text())
-    except Exception:
-        pass
-    return {"status": "unknown", "error": None, "timestamp": None}
+    """Load previous state, reading the file at most once per process."""
+    global _STATE_CACHE
+    if _STATE_CACHE is None:
+        state = None
+        try:
+            if STATE_FILE.exists():
+                state = _loads(STATE_FILE.read_bytes())
+        except Exception:
+            pass
+        _STATE_CACHE = state or {"status": "unknown", "error": None, "timestamp": None}
+    return _STATE_CACHE
 
 
 def save_state(status, error=None):
-    """Save current state to file."""
+    """Save current state; the file is only rewritten when status/error change."""
+    global _STATE_CACHE
+    previous = load_state()
+    if (previous.get("status"), previous.get("error")) == (status, error):
+        return
+    _STATE_CACHE = {
+        "status": status,
+        "error": error,
+        "timestamp": datetime.now().isoformat(),
+    }
     try:
-        state = {
-            "status": status,
-            "error": error,
-            "timestamp": datetime.now().isoformat(),
-        }
-        STATE_FILE.write_text(json.dumps(state, indent=2))
+        tmp_path = STATE_FILE.with_name(f"{STATE_FILE.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(_dumps(_STATE_CACHE, indent=True))
+        os.replace(tmp_path, STATE_FILE)
     except Exception:
         pass
 
@@ -88,32 +273,80 @@ def should_send_alert(current_status, current_error):
     return None
 
 
+_TG_QUEUE = queue.Queue()
+_TG_WORKER = None
+_TG_EXIT_TIMEOUT_S = 10
+
+
+def _tg_worker():
+    while True:
+        item = _TG_QUEUE.get()
+        if item is None:
+            return
+        _send_telegram_log_now(*item)
+
+
+def _flush_telegram_queue():
+    """At exit, let queued notifications ship, but never hang the process."""
+    if _TG_WORKER is None:
+        return
+    _TG_QUEUE.put(None)
+    _TG_WORKER.join(timeout=_TG_EXIT_TIMEOUT_S)
+
+
 def send_telegram_log(title: str, text: str) -> None:
-    """Send log message to Telegram in chunks if needed."""
+    """Queue a log message for the background Telegram sender."""
+    global _TG_WORKER
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         return
+    if _TG_WORKER is None:
+        _TG_WORKER = threading.Thread(target=_tg_worker, name="telegram", daemon=True)
+        _TG_WORKER.start()
+        atexit.register(_flush_telegram_queue)
+    _TG_QUEUE.put_nowait((title, text))
+
+
+def _send_telegram_log_now(title: str, text: str) -> None:
+    """Send log message to Telegram; text too long for one message goes as a file."""
 
-    # 2 KiB limit (2048 bytes) - use 1800 chars for safety with HTML tags
-    chunk_size = 1800
+    # Telegram allows 4096 chars per message; leave room for the title and tags
+    escaped_title = html.escape(title)
+    chunk_size = 3900 - len(escaped_title) - 32
     escaped = html.escape(text)
 
-    for idx, part in enumerate(_chunks(escaped, chunk_size), start=1):
-        t = title if idx == 1 else f"{title} (cont. {idx})"
-        payload = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "text": f"<b>{html.escape(t)}</b>\n<pre>{part}</pre>",
-            "parse_mode": "HTML",
-            "link_preview_options": {"is_disabled": True},
-            "disable_notification": True,
-        }
-        try:
-            r = requests.post(f"{API_BASE}/sendMessage", json=payload, timeout=5)
-            r.raise_for_status()
-            data = r.json()
-            if not data.get("ok"):
-                raise RuntimeError(data)
-        except Exception as e:
-            print(f"Failed to send Telegram notification: {e}", file=sys.stderr)
+    try:
+        if len(escaped) <= chunk_size:
+            payload = {
+                "chat_id": TELEGRAM_CHAT_ID,
+                "text": f"<b>{escaped_title}</b>\n<pre>{escaped}</pre>",
+                "parse_mode": "HTML",
+                "link_preview_options": {"is_disabled": True},
+                "disable_notification": True,
+            }
+            r = _tg_post(
+                f"{API_BASE}/sendMessage",
+                data=_dumps(payload).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                timeout=5,
+            )
+        else:
+            # One sendDocument request instead of a sendMessage per chunk
+            r = _tg_post(
+                f"{API_BASE}/sendDocument",
+                data={
+                    "chat_id": TELEGRAM_CHAT_ID,
+                    "caption": title[:1024],
+                    "disable_notification": "true",
+                },
+                files={"document": ("cc_usage_web.log", io.BytesIO(text.encode("utf-8")), "text/plain")},
+                timeout=5,
+            )
+        r.raise_for_status()
+        data = _loads(r.content)
+        if not data.get("ok"):
+            raise RuntimeError(data)
+    except Exception as e:
+        print(f"Failed to send Telegram notification: {e}", file=sys.stderr)
 
 
 class TelegramErrorHandler(logging.Handler):
@@ -141,7 +374,7 @@ class TelegramErrorHandler(logging.Handler):
                 if self.verbose:
                     print(f"[Telegram] Error alert sent (state: {STATE_FILE})", file=sys.stderr)
             elif alert_type is None:
-                # Same error - just update timestamp
+                # Same error - state is unchanged, so this writes nothing
                 save_state("error", error_key)
                 if self.verbose:
                     print(f"[Telegram] Same error - alert suppressed (state: {STATE_FILE})", file=sys.stderr)
@@ -168,6 +401,7 @@ def format_timestamp():
     return datetime.now().strftime("%Y%m%d-%H%M%S")
 
 
+@functools.lru_cache(maxsize=64)
 def xpath_literal(text):
     if "'" not in text:
         return f"'{text}'"
@@ -192,7 +426,7 @@ def convert_web_reset_format(web_format):
     tz_name = now.astimezone().tzname()
 
     # Handle "in X hr Y min" format
-    relative_match = re.match(r"^in\s+(?:(\d+)\s*hr?)?\s*(?:(\d+)\s*min)?", web_format, re.IGNORECASE)
+    relative_match = _RELATIVE_RE.match(web_format)
     if relative_match:
         hours = int(relative_match.group(1)) if relative_match.group(1) else 0
         minutes = int(relative_match.group(2)) if relative_match.group(2) else 0
@@ -206,10 +440,9 @@ def convert_web_reset_format(web_format):
         return f"{hour}:{minute:02d}{ampm} ({tz_name})"
 
     # Handle "Mon 12:00 PM" format
-    weekday_match = re.match(r"^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d{1,2}):(\d{2})\s*(AM|PM)", web_format, re.IGNORECASE)
+    weekday_match = _WEEKDAY_RE.match(web_format)
     if weekday_match:
-        weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        target_day = weekdays.index(weekday_match.group(1))
+        target_day = _WEEKDAY_INDEX[weekday_match.group(1).title()]
         hour = int(weekday_match.group(2))
         minute = int(weekday_match.group(3))
         ampm = weekday_match.group(4).lower()
@@ -227,8 +460,7 @@ def convert_web_reset_format(web_format):
         reset_date = now + timedelta(days=days_ahead)
         reset_date = reset_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
 
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        month = months[reset_date.month - 1]
+        month = _MONTH_ABBR[reset_date.month - 1]
         day = reset_date.day
 
         display_hour = reset_date.hour
@@ -242,70 +474,145 @@ def convert_web_reset_format(web_format):
 
 
 def parse_usage_text(text):
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    fields = {"session_used": "", "session_resets": "", "weekly_used": "", "weekly_resets": ""}
+    missing = len(fields)
     section = None
-    weekly_all_models = False
-    session_used = ""
-    session_resets = ""
-    weekly_used = ""
-    weekly_resets = ""
-
-    for line in lines:
-        if line == "Current session":
-            section = "session"
+
+    # Lines before the first section header cannot match; start scanning at
+    # the line holding the earliest marker instead of splitting the preamble.
+    marker_positions = [pos for pos in map(text.find, _SECTION_MARKERS) if pos != -1]
+    if marker_positions:
+        text = text[text.rfind("\n", 0, min(marker_positions)) + 1 :]
+    else:
+        text = ""
+
+    for line in (raw.strip() for raw in text.splitlines()):
+        if not line:
             continue
-        if line == "Weekly limits":
-            section = "weekly"
-            weekly_all_models = False
+        header = _SECTION_HEADERS.get(line)
+        if header:
+            section = header
             continue
         if line.startswith("Current week"):
             section = "weekly"
-            weekly_all_models = True
             continue
-        if section == "weekly" and line == "All models":
-            weekly_all_models = True
+        if line == "All models" and section in _WEEKLY_SECTIONS:
+            section = "weekly"
+            continue
+
+        section_fields = _SECTION_FIELDS.get(section)
+        if section_fields is None:
+            continue
+        used_key, resets_key = section_fields
+        if not fields[resets_key] and line[:_RESETS_PREFIX_LEN] == _RESETS_PREFIX:
+            fields[resets_key] = line[_RESETS_PREFIX_LEN:]
+        elif not fields[used_key] and (match := _PERCENT_USED_RE.search(line)):
+            fields[used_key] = match.group(0)
+        else:
             continue
 
-        if section == "session":
-            if not session_resets and line.startswith("Resets "):
-                session_resets = line.replace("Resets ", "", 1)
-                continue
-            if not session_used:
-                match = re.search(r"\b\d{1,3}%\s*used\b", line)
-                if match:
-                    session_used = match.group(0)
-                    continue
-
-        if section == "weekly" and weekly_all_models:
-            if not weekly_resets and line.startswith("Resets "):
-                weekly_resets = line.replace("Resets ", "", 1)
-                continue
-            if not weekly_used:
-                match = re.search(r"\b\d{1,3}%\s*used\b", line)
-                if match:
-                    weekly_used = match.group(0)
-                    continue
-
-    return {
-        "session_used": session_used,
-        "session_resets": convert_web_reset_format(session_resets),
-        "weekly_used": weekly_used,
-        "weekly_resets": convert_web_reset_format(weekly_resets),
+        # A field was just filled; nothing else can change once all four are
+        missing -= 1
+        if not missing:
+            break
+
+    fields["session_resets"] = convert_web_reset_format(fields["session_resets"])
+    fields["weekly_resets"] = convert_web_reset_format(fields["weekly_resets"])
+    return fields
+
+
+# In-browser port of parse_usage_text: walks <main> innerText and returns the
+# four raw fields, or null until the page shows the marker text.
+_USAGE_EXTRACT_JS = r"""() => {
+  const main = document.querySelector('main');
+  const text = main ? main.innerText : '';
+  if (!text.includes(__MARKER__)) return null;
+  const out = {session_used: '', session_resets: '', weekly_used: '', weekly_resets: ''};
+  const percent = /\b\d{1,3}%\s*used\b/;
+  let section = null;
+  let allModels = false;
+  for (const raw of text.split(/\r\n|[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]/)) {
+    const line = raw.trim();
+    if (!line) continue;
+    if (line === 'Current session') { section = 'session'; allModels = false; continue; }
+    if (line === 'Weekly limits') { section = 'weekly'; allModels = false; continue; }
+    if (line.startsWith('Current week')) { section = 'weekly'; allModels = true; continue; }
+    if (section === 'weekly' && line === 'All models') { allModels = true; continue; }
+    const key = section === 'session' ? 'session' : (section === 'weekly' && allModels ? 'weekly' : null);
+    if (key) {
+      if (!out[key + '_resets'] && line.startsWith('Resets ')) {
+        out[key + '_resets'] = line.slice(7);
+      } else if (!out[key + '_used']) {
+        const match = line.match(percent);
+        if (match) out[key + '_used'] = match[0];
+      }
     }
+    if (out.session_used && out.session_resets && out.weekly_used && out.weekly_resets) break;
+  }
+  return out;
+}"""
+
+
+@functools.lru_cache(maxsize=4)
+def usage_extract_js(marker):
+    """JS function source extracting the raw usage fields once `marker` is shown."""
+    return _USAGE_EXTRACT_JS.replace("__MARKER__", json.dumps(marker))
+
 
+def write_logfile(logfile, text):
+    with open(logfile, "w", encoding="utf-8") as f:
+        f.write(text)
 
 
+def resolve_usage(raw, read_main_text, logfile):
+    """Finish the in-browser extraction `raw`, falling back to parse_usage_text.
+
+    On success the logfile records the extracted fields; otherwise the full
+    <main> text is fetched with `read_main_text` so the logfile shows what failed.
+    """
+    if raw:
+        parsed = {
+            "session_used": raw.get("session_used") or "",
+            "session_resets": convert_web_reset_format(raw.get("session_resets") or ""),
+            "weekly_used": raw.get("weekly_used") or "",
+            "weekly_resets": convert_web_reset_format(raw.get("weekly_resets") or ""),
+        }
+        if parsed["session_used"] and parsed["weekly_used"]:
+            write_logfile(logfile, _dumps(raw, indent=True))
+            return parsed
+
+    main_text = read_main_text() or ""
+    write_logfile(logfile, main_text)
+    return parse_usage_text(main_text)
+
+
+def saved_chrome_pid():
+    """PID of the background Chrome recorded in CHROME_PID_FILE, if any."""
+    try:
+        return int(CHROME_PID_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
 
 def cleanup_stale_lock(profile_dir):
     """Remove Chrome profile lock if process is dead."""
     lock_path = Path(profile_dir) / "SingletonLock"
-    if not lock_path.exists():
+    try:
+        # Chrome's lock is a dangling symlink to "<hostname>-<pid>"
+        lock_stat = lock_path.lstat()
+    except OSError:
         return
 
     try:
-        target = lock_path.read_text().strip()
+        if stat.S_ISLNK(lock_stat.st_mode):
+            target = os.readlink(lock_path)
+        else:
+            target = lock_path.read_text().strip()
         if "-" in target:
             pid = int(target.split("-")[-1])
+            # A fresh lock held by the Chrome we started needs no probe
+            if lock_stat.st_mtime > time.time() - 5 and pid == saved_chrome_pid():
+                return
             # Check if process exists
             try:
                 os.kill(pid, 0)  # Signal 0 just checks if process exists
@@ -322,8 +629,29 @@ def cleanup_stale_lock(profile_dir):
             pass
 
 
+def attach_driver(endpoint):
+    """Drive the already running Chrome at `endpoint` instead of launching one."""
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("debuggerAddress", urlparse(endpoint).netloc)
+    return webdriver.Chrome(options=options)
+
+
 def build_driver(profile_dir, headless):
+    from selenium import webdriver
+
     try:
+        # Headless runs reuse the background Chrome when one serves the profile
+        endpoint = running_chrome_endpoint(profile_dir) if headless else None
+        if endpoint:
+            print(f"[DEBUG] Attaching to Chrome at {endpoint}", file=sys.stderr)
+            driver = attach_driver(endpoint)
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            return driver
+
         # Clean up stale locks before starting
         cleanup_stale_lock(profile_dir)
 
@@ -331,20 +659,18 @@ def build_driver(profile_dir, headless):
         options.add_argument(f"--user-data-dir={profile_dir}")
 
         # Cache directory for faster page loading
-        cache_dir = "/tmp/chrome-cache"
-        options.add_argument(f"--disk-cache-dir={cache_dir}")
+        options.add_argument(f"--disk-cache-dir={CHROME_CACHE_DIR}")
 
         # Fast page loading - don't wait for images/stylesheets
         options.page_load_strategy = "eager"
 
-        # Headless mode
+        # New headless mode shares the headful code path and boots faster
         if headless:
-            options.add_argument("--headless")
+            options.add_argument("--headless=new")
 
         # Standard options
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
         options.add_argument("--window-size=3840,2160")
 
         # Enhanced anti-detection measures (bypass Cloudflare)
@@ -353,23 +679,25 @@ def build_driver(profile_dir, headless):
         options.add_experimental_option("useAutomationExtension", False)
 
         # Additional stealth options
-        options.add_argument("--disable-features=VizDisplayCompositor")
         options.add_argument("--disable-extensions")
         options.add_argument("--disable-background-networking")
 
-        # Only disable images in headless mode for performance
-        if headless:
-            options.add_argument("--disable-images")
-
         options.add_argument("--no-first-run")
         options.add_argument("--no-default-browser-check")
         options.add_argument("--disable-default-apps")
 
+        # Skip background work, images and notification prompts
+        for flag in CHROME_SPEED_FLAGS:
+            options.add_argument(flag)
+        prefs = {"profile.default_content_setting_values.notifications": 2}
+        if headless:
+            for flag in HEADLESS_SPEED_FLAGS:
+                options.add_argument(flag)
+            prefs["profile.managed_default_content_settings.images"] = 2
+        options.add_experimental_option("prefs", prefs)
+
         # Real user agent
-        options.add_argument(
-            "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+        options.add_argument(f"--user-agent={USER_AGENT}")
 
         # Debug: show Chrome command
         args_list = [arg for arg in options.arguments]
@@ -377,14 +705,17 @@ def build_driver(profile_dir, headless):
         print(f"[DEBUG] Profile dir: {profile_dir}", file=sys.stderr)
         print(f"[DEBUG] Experimental options: {options.experimental_options}", file=sys.stderr)
 
+        started = time.monotonic()
         driver = webdriver.Chrome(options=options)
+        print(f"[DEBUG] Chrome started in {time.monotonic() - started:.2f}s", file=sys.stderr)
 
         # Setup anti-detection JavaScript
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
-        driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
-        driver.execute_script("Object.defineProperty(navigator, 'permissions', {get: () => undefined})")
-        driver.execute_script("window.chrome = { runtime: {} }")
+        for script in STEALTH_SCRIPTS:
+            driver.execute_script(script)
+
+        # Block fonts, images, media and trackers in both modes
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
 
         return driver
     except Exception as e:
@@ -392,55 +723,447 @@ def build_driver(profile_dir, headless):
         raise
 
 
-def wait_for_email_input(driver, email_label, timeout_s):
+@functools.lru_cache(maxsize=8)
+def email_xpaths(email_label):
     label = xpath_literal(email_label)
-    xpaths = [
+    return (
         f"//*[@aria-label={label}]",
         f"//*[@placeholder={label}]",
         f"//label[normalize-space()={label}]/following::input[1]",
         f"//label[normalize-space()={label}]/following::textarea[1]",
         f"//*[normalize-space()={label}]/following::input[1]",
         f"//*[normalize-space()={label}]/following::textarea[1]",
-    ]
+    )
 
-    start = time.time()
-    while time.time() - start < timeout_s:
-        for xpath in xpaths:
-            try:
-                element = driver.find_element(By.XPATH, xpath)
-                if element:
-                    return element
-            except NoSuchElementException:
-                continue
-        time.sleep(0.2)
-    return None
 
+def poll_until(probe, timeout_s, ignored=()):
+    """Return the first truthy probe() result, or None after timeout_s.
 
-def wait_for_text_in_main(driver, text, timeout_s):
-    start = time.time()
-    while time.time() - start < timeout_s:
+    Retries start 20 ms apart and back off to 200 ms; the deadline uses the
+    monotonic clock so wall-clock steps cannot shorten or stretch it.
+    """
+    deadline = time.monotonic() + timeout_s
+    delay = 0.02
+    while True:
         try:
-            main = driver.find_element(By.TAG_NAME, "main")
-            if text in main.text:
-                return main
-        except NoSuchElementException:
+            result = probe()
+            if result:
+                return result
+        except ignored:
             pass
-        time.sleep(0.2)
-    return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, 0.2)
+
+
+@functools.lru_cache(maxsize=8)
+def email_node_js(email_label):
+    """JS function source returning the email input node, or null.
+
+    The aria-label/placeholder CSS selector covers the common case; the label
+    XPaths from email_xpaths are only evaluated when it finds nothing.
+    """
+    return (
+        "() => {"
+        f"  const label = CSS.escape({json.dumps(email_label)});"
+        "  const node = document.querySelector("
+        "    `[aria-label=\"${label}\"], [placeholder=\"${label}\"]`);"
+        "  if (node) return node;"
+        f"  for (const xpath of {json.dumps(email_xpaths(email_label)[2:])}) {{"
+        "    const found = document.evaluate(xpath, document, null,"
+        "      XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;"
+        "    if (found) return found;"
+        "  }"
+        "  return null;"
+        "}"
+    )
+
+
+def wait_for_email_input(driver, email_label, timeout_s):
+    from selenium.common.exceptions import JavascriptException
+
+    # The whole lookup runs in the page: one driver round-trip per poll
+    script = f"return ({email_node_js(email_label)})()"
+    return poll_until(
+        lambda: driver.execute_script(script),
+        timeout_s,
+        ignored=(JavascriptException,),
+    )
+
+
+def wait_for_text_in_main(driver, text, timeout_s):
+    from selenium.common.exceptions import JavascriptException
+
+    # textContent needs no layout pass; innerText is only read for parsing
+    script = (
+        "const main = document.querySelector('main');"
+        "return main && main.textContent.includes(arguments[0]) ? main : null;"
+    )
+    return poll_until(
+        lambda: driver.execute_script(script, text),
+        timeout_s,
+        ignored=(JavascriptException,),
+    )
 
 
 def capture_login_snapshot(driver, outdir, stamp):
-    html_path = Path(outdir) / f"login-snapshot-{stamp}.html"
-    png_path = Path(outdir) / f"login-snapshot-{stamp}.png"
-    html_path.write_text(driver.page_source, encoding="utf-8")
+    from selenium.common.exceptions import WebDriverException
+
+    html_path = str(outdir / f"login-snapshot-{stamp}.html")
+    png_path = str(outdir / f"login-snapshot-{stamp}.png")
+    write_logfile(html_path, driver.page_source)
     try:
-        driver.save_screenshot(str(png_path))
+        driver.save_screenshot(png_path)
     except WebDriverException:
         png_path = None
     return html_path, png_path
 
 
-def scrape_with_selenium(
+class CDPError(RuntimeError):
+    """Raised when a CDP command fails or the page throws."""
+
+
+class CDPSession:
+    """Minimal synchronous Chrome DevTools Protocol client.
+
+    All commands share one websocket to the page target, so a scrape costs
+    one message per command instead of an HTTP round-trip through
+    ChromeDriver for every element lookup.
+    """
+
+    def __init__(self, ws_url, timeout_s):
+        # websocket-client comes with selenium; only CDP scrapes import it
+        import websocket
+
+        self._timeout_error = websocket.WebSocketTimeoutException
+        self.timeout_s = timeout_s
+        self._ws = websocket.create_connection(
+            ws_url, timeout=timeout_s, suppress_origin=True
+        )
+        self._next_id = 0
+        self._events = []
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+    def send(self, method, params=None):
+        self._next_id += 1
+        msg_id = self._next_id
+        self._ws.send(_dumps({"id": msg_id, "method": method, "params": params or {}}))
+        while True:
+            message = _loads(self._ws.recv())
+            if message.get("id") == msg_id:
+                if "error" in message:
+                    raise CDPError(f"{method}: {message['error'].get('message')}")
+                return message.get("result", {})
+            if "method" in message:
+                self._events.append(message)
+
+    def wait_for_event(self, method, timeout_s):
+        """Return params of the next `method` event, or None on timeout."""
+        for idx, event in enumerate(self._events):
+            if event["method"] == method:
+                del self._events[: idx + 1]
+                return event.get("params", {})
+        self._events.clear()
+
+        deadline = time.monotonic() + timeout_s
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._ws.settimeout(remaining)
+                try:
+                    message = _loads(self._ws.recv())
+                except self._timeout_error:
+                    return None
+                if message.get("method") == method:
+                    return message.get("params", {})
+        finally:
+            self._ws.settimeout(self.timeout_s)
+
+    def evaluate(self, expression, await_promise=False):
+        result = self.send(
+            "Runtime.evaluate",
+            {
+                "expression": expression,
+                "returnByValue": True,
+                "awaitPromise": await_promise,
+            },
+        )
+        if "exceptionDetails" in result:
+            raise CDPError(f"Runtime.evaluate: {result['exceptionDetails'].get('text')}")
+        return result.get("result", {}).get("value")
+
+    def wait_for_value(self, probe, timeout_s):
+        """Resolve as soon as the JS function source `probe` returns non-null.
+
+        A MutationObserver re-runs the probe on DOM changes inside the page,
+        so there is no client-side polling interval. Returns None on timeout.
+        """
+        expression = (
+            "new Promise((resolve) => {"
+            f"  const probe = {probe};"
+            "  const check = () => { try { return probe(); } catch (e) { return null; } };"
+            "  const first = check();"
+            "  if (first !== null && first !== undefined) { resolve(first); return; }"
+            "  const observer = new MutationObserver(() => {"
+            "    const value = check();"
+            "    if (value !== null && value !== undefined) {"
+            "      observer.disconnect(); clearTimeout(timer); resolve(value);"
+            "    }"
+            "  });"
+            "  observer.observe(document, {childList: true, subtree: true, characterData: true, attributes: true});"
+            f"  const timer = setTimeout(() => {{ observer.disconnect(); resolve(null); }}, {int(timeout_s * 1000)});"
+            "})"
+        )
+        deadline = time.monotonic() + timeout_s
+        delay = 0.02
+        self._ws.settimeout(timeout_s + 5)
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    return self.evaluate(expression, await_promise=True)
+                except CDPError:
+                    # Context destroyed by a client-side redirect; retry in the new document
+                    time.sleep(delay)
+                    delay = min(delay * 1.5, 0.2)
+            return None
+        finally:
+            self._ws.settimeout(self.timeout_s)
+
+    def navigate(self, url, timeout_s):
+        self._events.clear()
+        result = self.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CDPError(f"Page.navigate {url}: {result['errorText']}")
+        # Same readiness point as Selenium's "eager" page load strategy
+        return self.wait_for_event("Page.domContentEventFired", timeout_s) is not None
+
+
+def find_chrome_binary():
+    chrome_bin = os.environ.get("CHROME_BIN")
+    if chrome_bin:
+        return chrome_bin
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def launch_chrome(chrome_bin, profile_dir, headless, timeout_s):
+    """Start Chrome with remote debugging; returns (process, http endpoint)."""
+    cleanup_stale_lock(profile_dir)
+    port_file = Path(profile_dir) / "DevToolsActivePort"
+    try:
+        port_file.unlink()
+    except FileNotFoundError:
+        pass
+
+    cmd = [
+        chrome_bin,
+        f"--user-data-dir={profile_dir}",
+        "--remote-debugging-port=0",
+        f"--disk-cache-dir={CHROME_CACHE_DIR}",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--window-size=3840,2160",
+        "--disable-blink-features=AutomationControlled",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-default-apps",
+        *CHROME_SPEED_FLAGS,
+        f"--user-agent={USER_AGENT}",
+    ]
+    if headless:
+        cmd.append("--headless=new")
+        cmd.extend(HEADLESS_SPEED_FLAGS)
+    cmd.append("about:blank")
+    print(f"[DEBUG] Chrome command: {cmd}", file=sys.stderr)
+
+    # Own session so the browser outlives this run and is reused by the next
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    # Chrome writes the chosen port to DevToolsActivePort once it listens
+    def read_port():
+        if process.poll() is not None:
+            raise RuntimeError(f"Chrome exited during startup (code {process.returncode})")
+        return port_file.read_text().splitlines()[0].strip()
+
+    port = poll_until(read_port, timeout_s, ignored=(OSError, IndexError))
+    if port:
+        try:
+            CHROME_PID_FILE.write_text(str(process.pid))
+        except OSError:
+            pass
+        return process, f"http://127.0.0.1:{port}"
+    stop_chrome(process)
+    raise RuntimeError(f"Chrome did not open a debugging port within {timeout_s}s")
+
+
+def devtools_json(endpoint, path, method="GET", timeout=5):
+    """Call Chrome's local DevTools HTTP API; raises OSError or ValueError."""
+    import urllib.request
+
+    request = urllib.request.Request(f"{endpoint}{path}", method=method)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return _loads(response.read())
+
+
+def running_chrome_endpoint(profile_dir):
+    """Return the endpoint of a Chrome already serving `profile_dir`, if any."""
+    try:
+        port = (Path(profile_dir) / "DevToolsActivePort").read_text().splitlines()[0].strip()
+    except (OSError, IndexError):
+        return None
+    endpoint = f"http://127.0.0.1:{port}"
+    try:
+        devtools_json(endpoint, "/json/version", timeout=0.2)
+    except (OSError, ValueError):
+        return None
+    return endpoint
+
+
+def ensure_chrome(chrome_bin, profile_dir, timeout_s, verbose):
+    """Attach to the background Chrome for this profile, starting it if needed."""
+    endpoint = running_chrome_endpoint(profile_dir)
+    if endpoint:
+        log(f"Reusing running Chrome at {endpoint}", verbose)
+        return endpoint
+    _, endpoint = launch_chrome(chrome_bin, profile_dir, True, timeout_s)
+    log(f"Started background Chrome at {endpoint}", verbose)
+    return endpoint
+
+
+def is_profile_chrome(pid, profile_dir):
+    """True if `pid` is a Chrome running on `profile_dir`, not a reused PID."""
+    if os.path.exists("/proc/self/cmdline"):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as handle:
+                args = handle.read().split(b"\0")
+        except OSError:
+            return False
+        return os.fsencode(f"--user-data-dir={profile_dir}") in args
+
+    # No /proc (macOS): the profile lock points at "<hostname>-<pid>" of its holder
+    try:
+        target = os.readlink(Path(profile_dir) / "SingletonLock")
+    except OSError:
+        return False
+    return target.rsplit("-", 1)[-1] == str(pid)
+
+
+def stop_persistent_chrome(profile_dir):
+    """Stop the background Chrome, e.g. before the profile is opened elsewhere."""
+    pid = saved_chrome_pid()
+    if pid is None:
+        return
+    if not is_profile_chrome(pid, profile_dir):
+        # Chrome exited on its own; the PID may belong to another process by now
+        try:
+            CHROME_PID_FILE.unlink()
+        except OSError:
+            pass
+        return
+
+    def exited():
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return True
+        return False
+
+    try:
+        os.kill(pid, signal.SIGTERM)
+        if not poll_until(exited, 5):
+            os.kill(pid, signal.SIGKILL)
+    except OSError:
+        # Already gone
+        pass
+    try:
+        CHROME_PID_FILE.unlink()
+    except OSError:
+        pass
+
+
+def stop_chrome(process):
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def open_page_session(endpoint, timeout_s):
+    """Attach to the first page target of the browser at `endpoint`."""
+    targets = devtools_json(endpoint, "/json/list")
+    pages = [t for t in targets if t.get("type") == "page" and t.get("webSocketDebuggerUrl")]
+    if pages:
+        ws_url = pages[0]["webSocketDebuggerUrl"]
+    else:
+        ws_url = devtools_json(endpoint, "/json/new?about:blank", method="PUT")[
+            "webSocketDebuggerUrl"
+        ]
+
+    session = CDPSession(ws_url, timeout_s)
+    session.send("Page.enable")
+    session.send("Runtime.enable")
+    session.send("Network.enable")
+    session.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    session.send(
+        "Page.addScriptToEvaluateOnNewDocument",
+        {"source": ";\n".join(STEALTH_SCRIPTS)},
+    )
+    return session
+
+
+@functools.lru_cache(maxsize=8)
+def email_probe_js(email_label):
+    """JS function source: email input value, "" if empty, null if absent."""
+    return (
+        "() => {"
+        f"  const node = ({email_node_js(email_label)})();"
+        "  return node ? (node.value || '') : null;"
+        "}"
+    )
+
+
+def cdp_email_value(session, email_label, timeout_s):
+    """Return the email input value, "" if the input is empty, None if absent."""
+    return session.wait_for_value(email_probe_js(email_label), timeout_s)
+
+
+def cdp_login_snapshot(session, outdir, stamp):
+    html_path = str(outdir / f"login-snapshot-{stamp}.html")
+    png_path = str(outdir / f"login-snapshot-{stamp}.png")
+    write_logfile(html_path, session.evaluate("document.documentElement.outerHTML") or "")
+    try:
+        data = session.send("Page.captureScreenshot", {"format": "png"})["data"]
+        with open(png_path, "wb") as f:
+            f.write(base64.b64decode(data))
+    except (CDPError, KeyError, OSError):
+        png_path = None
+    return html_path, png_path
+
+
+def scrape_with_cdp(
+    chrome_bin,
     profile_dir,
     outdir,
     email_url,
@@ -449,57 +1172,62 @@ def scrape_with_selenium(
     timeout_s,
     verbose,
 ):
-    driver = build_driver(profile_dir, headless=True)
+    """Same flow and result shape as scrape_with_selenium, driven over raw CDP.
+
+    The headless browser is left running so later runs skip Chrome startup.
+    """
     stamp = format_timestamp()
-    logfile = str(Path(outdir) / f"usage-web-{stamp}.txt")
+    logfile = str(outdir / f"usage-web-{stamp}.txt")
+    session = None
 
     try:
-        log(f"Headless: {email_url}", verbose)
-        driver.get(email_url)
+        endpoint = ensure_chrome(chrome_bin, profile_dir, timeout_s, verbose)
+        session = open_page_session(endpoint, timeout_s)
 
-        if "/login" in driver.current_url or "/signup" in driver.current_url:
-            snapshot_html, snapshot_png = capture_login_snapshot(
-                driver, outdir, stamp
-            )
+        log(f"Headless (CDP): {email_url}", verbose)
+        session.navigate(email_url, timeout_s)
+
+        current_url = session.evaluate("location.href") or ""
+        if "/login" in current_url or "/signup" in current_url:
+            snapshot_html, snapshot_png = cdp_login_snapshot(session, outdir, stamp)
             # Not an error - user is simply logged out
             return {
                 "status": "not_logged_in",
-                "logfile": str(snapshot_html),
-                "snapshot_html": str(snapshot_html),
-                "snapshot_png": str(snapshot_png) if snapshot_png else None,
+                "logfile": snapshot_html,
+                "snapshot_html": snapshot_html,
+                "snapshot_png": snapshot_png,
             }
 
-        email_input = wait_for_email_input(driver, email_label, timeout_s)
-        if not email_input:
-            snapshot_html, snapshot_png = capture_login_snapshot(
-                driver, outdir, stamp
-            )
+        email_value = cdp_email_value(session, email_label, timeout_s)
+        if email_value is None:
+            snapshot_html, snapshot_png = cdp_login_snapshot(session, outdir, stamp)
             # Not an error - user is simply logged out
             return {
                 "status": "not_logged_in",
-                "logfile": str(snapshot_html),
-                "snapshot_html": str(snapshot_html),
-                "snapshot_png": str(snapshot_png) if snapshot_png else None,
+                "logfile": snapshot_html,
+                "snapshot_html": snapshot_html,
+                "snapshot_png": snapshot_png,
             }
 
-        email_value = (email_input.get_attribute("value") or "").strip()
+        email_value = email_value.strip()
         if not email_value:
             # This is an actual error - logged in but can't read email
             logger.error("Failed to parse email value from input field (logged in but email field empty)")
             return {"status": "failed_to_parse_email", "logfile": logfile}
 
-        log(f"Headless: {usage_url}", verbose)
-        driver.get(usage_url)
-        main = wait_for_text_in_main(driver, "Plan usage limits", timeout_s)
-        if not main:
+        log(f"Headless (CDP): {usage_url}", verbose)
+        session.navigate(usage_url, timeout_s)
+        raw = session.wait_for_value(usage_extract_js("Plan usage limits"), timeout_s)
+        if not raw:
             # This is an actual error - logged in but usage page won't load
             logger.error(f"Failed to load usage page within {timeout_s}s timeout (logged in but page timeout)")
             return {"status": "failed_to_load_usage", "logfile": logfile}
 
-        main_text = main.text
-        Path(logfile).write_text(main_text, encoding="utf-8")
-
-        parsed = parse_usage_text(main_text)
+        parsed = resolve_usage(
+            raw,
+            lambda: session.evaluate("document.querySelector('main')?.innerText"),
+            logfile,
+        )
         if not parsed["session_used"] or not parsed["weekly_used"]:
             # This is an actual error - page loaded but parsing failed
             logger.error(
@@ -520,6 +1248,101 @@ def scrape_with_selenium(
             "logfile": logfile,
         }
         return {"status": "ok", "payload": payload}
+    except Exception as e:
+        logger.exception(f"Unexpected error in scrape_with_cdp: {e}")
+        return {"status": "unexpected_error", "logfile": logfile}
+    finally:
+        if session is not None:
+            session.close()
+
+
+def check_login(driver, outdir, stamp, logfile, email_url, email_label, timeout_s, verbose):
+    """Open the email settings page; returns (email, None) or (None, result)."""
+    log(f"Headless: {email_url}", verbose)
+    driver.get(email_url)
+
+    email_input = None
+    if "/login" not in driver.current_url and "/signup" not in driver.current_url:
+        email_input = wait_for_email_input(driver, email_label, timeout_s)
+    if not email_input:
+        snapshot_html, snapshot_png = capture_login_snapshot(driver, outdir, stamp)
+        # Not an error - user is simply logged out
+        return None, {
+            "status": "not_logged_in",
+            "logfile": snapshot_html,
+            "snapshot_html": snapshot_html,
+            "snapshot_png": snapshot_png,
+        }
+
+    email_value = (email_input.get_attribute("value") or "").strip()
+    if not email_value:
+        # This is an actual error - logged in but can't read email
+        logger.error("Failed to parse email value from input field (logged in but email field empty)")
+        return None, {"status": "failed_to_parse_email", "logfile": logfile}
+    return email_value, None
+
+
+def fetch_usage(driver, usage_url, email_value, logfile, timeout_s, verbose):
+    """Scrape the usage page in an already logged-in driver."""
+    log(f"Headless: {usage_url}", verbose)
+    driver.get(usage_url)
+    main = wait_for_text_in_main(driver, "Plan usage limits", timeout_s)
+    if not main:
+        # This is an actual error - logged in but usage page won't load
+        logger.error(f"Failed to load usage page within {timeout_s}s timeout (logged in but page timeout)")
+        return {"status": "failed_to_load_usage", "logfile": logfile}
+
+    raw = driver.execute_script(f"return ({usage_extract_js('Plan usage limits')})()")
+    parsed = resolve_usage(
+        raw,
+        lambda: driver.execute_script(
+            "const main = document.querySelector('main');"
+            "return main ? main.innerText || main.textContent : '';"
+        ),
+        logfile,
+    )
+    if not parsed["session_used"] or not parsed["weekly_used"]:
+        # This is an actual error - page loaded but parsing failed
+        logger.error(
+            f"Failed to parse usage data. session_used={parsed['session_used']}, weekly_used={parsed['weekly_used']}, logfile={logfile}"
+        )
+        return {"status": "failed_to_parse_usage", "logfile": logfile}
+
+    payload = {
+        "current_session": {
+            "used": parsed["session_used"],
+            "resets": parsed["session_resets"],
+        },
+        "current_week_all_models": {
+            "used": parsed["weekly_used"],
+            "resets": parsed["weekly_resets"],
+        },
+        "email": email_value,
+        "logfile": logfile,
+    }
+    return {"status": "ok", "payload": payload}
+
+
+def scrape_with_selenium(
+    profile_dir,
+    outdir,
+    email_url,
+    usage_url,
+    email_label,
+    timeout_s,
+    verbose,
+):
+    driver = build_driver(profile_dir, headless=True)
+    stamp = format_timestamp()
+    logfile = str(outdir / f"usage-web-{stamp}.txt")
+
+    try:
+        email_value, failure = check_login(
+            driver, outdir, stamp, logfile, email_url, email_label, timeout_s, verbose
+        )
+        if failure:
+            return failure
+        return fetch_usage(driver, usage_url, email_value, logfile, timeout_s, verbose)
     except Exception as e:
         logger.exception(f"Unexpected error in scrape_with_selenium: {e}")
         return {"status": "unexpected_error", "logfile": logfile}
@@ -530,24 +1353,63 @@ def scrape_with_selenium(
             pass
 
 
-def run_visible_login(profile_dir, email_url, email_label, timeout_s, verbose):
+# Seconds between login checks; each one is a single WebDriver round trip
+LOGIN_POLL_S = 2
+
+
+def run_visible_login(profile_dir, outdir, email_url, usage_url, email_label, timeout_s, verbose):
+    """Show a browser for logging in, then scrape in that same driver.
+
+    Returns the scrape result once the email field shows up, or None when the
+    user closes the window first (the caller then retries headless).
+    """
+    from selenium.common.exceptions import JavascriptException, WebDriverException
+
+    site = urlparse(email_url).netloc
+    # URL and email in one round trip per tick
+    probe = f"return [location.href, ({email_probe_js(email_label)})()]"
     driver = build_driver(profile_dir, headless=False)
     try:
         log(f"Login browser: {email_url}", verbose)
         driver.get(email_url)
-
-        email_input = wait_for_email_input(driver, email_label, timeout_s)
-        if email_input:
-            log("Email field detected. Close the browser when done.", verbose)
-        else:
-            log("Login page displayed. Close the browser after logging in.", verbose)
+        log("Log in in the browser window; scraping continues once you are logged in.", verbose)
 
         while True:
             try:
-                _ = driver.title
+                try:
+                    current_url, email_value = driver.execute_script(probe)
+                except JavascriptException:
+                    # Page is navigating; look again on the next tick
+                    current_url, email_value = driver.current_url, ""
+                email_value = (email_value or "").strip()
+                if email_value:
+                    break
+                # Logged in and sent elsewhere on the site: go back to settings
+                parsed = urlparse(current_url)
+                if (
+                    parsed.netloc == site
+                    and "/login" not in parsed.path
+                    and "/signup" not in parsed.path
+                    and current_url.split("?")[0] != email_url
+                ):
+                    driver.get(email_url)
             except WebDriverException:
-                break
-            time.sleep(1)
+                # Our tab is gone; carry on in another one if the browser is still open
+                try:
+                    handles = driver.window_handles
+                except WebDriverException:
+                    handles = []
+                if not handles:
+                    return None
+                driver.switch_to.window(handles[-1])
+            time.sleep(LOGIN_POLL_S)
+
+        log("Logged in; scraping in the login browser.", verbose)
+        logfile = str(outdir / f"usage-web-{format_timestamp()}.txt")
+        return fetch_usage(driver, usage_url, email_value, logfile, timeout_s, verbose)
+    except Exception as e:
+        logger.exception(f"Unexpected error in run_visible_login: {e}")
+        return None
     finally:
         try:
             driver.quit()
@@ -555,24 +1417,90 @@ def run_visible_login(profile_dir, email_url, email_label, timeout_s, verbose):
             pass
 
 
-def log_to_db(payload, verbose):
+def send_to_logger_server(socket_path, db_path, data, timeout_s=10):
+    """Send one encoded JSON line to the resident logger (cc_usage_logger.py
+    --server) for db_path; True once it answers "ok"."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout_s)
+        sock.connect(socket_path)
+        db_line = b"DB " + os.path.realpath(db_path).encode("utf-8") + b"\n"
+        sock.sendall(db_line + data + b"\n")
+        with sock.makefile("rb") as reader:
+            if reader.readline().strip() != b"ok":
+                raise OSError(f"logger server on {socket_path} serves another database")
+            return reader.readline().strip() == b"ok"
+
+
+_LOGGER_MODULE = None
+
+
+def load_logger_module():
+    """Import cc_usage_logger.py from the script directory once per process."""
+    global _LOGGER_MODULE
+    if _LOGGER_MODULE is None:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location("cc_usage_logger", DEFAULT_LOGGER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _LOGGER_MODULE = module
+    return _LOGGER_MODULE
+
+
+def log_to_db(line, verbose):
+    """Log one payload, already serialized to a JSON line, to the usage database."""
     if os.environ.get("CC_USAGE_LOG_DB", "1") == "0":
         return 0
-    script_dir = Path(__file__).resolve().parent
-    logger_path = os.environ.get(
-        "CC_USAGE_LOGGER", str(script_dir / "cc_usage_logger.py")
-    )
-    db_path = os.environ.get(
-        "CC_USAGE_DB_PATH",
-        str(Path.home() / ".claude" / "db" / "cc_usage.db"),
+    logger_path = os.environ.get("CC_USAGE_LOGGER", DEFAULT_LOGGER_PATH)
+    db_path = os.environ.get("CC_USAGE_DB_PATH", DEFAULT_DB_PATH)
+    data = line.encode("utf-8")
+
+    # Only the bundled logger has a server mode worth reusing
+    use_server = (
+        logger_path == DEFAULT_LOGGER_PATH
+        and hasattr(socket, "AF_UNIX")
+        and os.environ.get("CC_USAGE_LOGGER_SERVER", "1") != "0"
     )
+    if use_server:
+        try:
+            socket_path = load_logger_module().default_socket_path(db_path)
+        except OSError as e:
+            log(f"Logger server unavailable ({e}); running logger directly", verbose)
+            use_server = False
+    if use_server:
+        try:
+            if send_to_logger_server(socket_path, db_path, data):
+                log("Logged via logger server", verbose)
+                return 0
+            logger.error("Logger server failed to log payload")
+            return 1
+        except (FileNotFoundError, ConnectionRefusedError):
+            # No server yet: start one for the next run, log this one directly
+            log(f"Starting logger server on {socket_path}", verbose)
+            subprocess.Popen(
+                [sys.executable, logger_path, "--db", db_path, "--server", "--socket", socket_path],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            log(f"Logger server unavailable ({e}); running logger directly", verbose)
+
+    # The bundled logger runs in-process; a custom CC_USAGE_LOGGER still runs as a child
+    if logger_path == DEFAULT_LOGGER_PATH:
+        try:
+            return load_logger_module().log_payload(db_path, line, verbose)
+        except Exception as e:
+            logger.exception(f"Failed to log usage to {db_path}: {e}")
+            return 1
+
     cmd = [sys.executable, logger_path, "--db", db_path]
     if verbose:
         cmd.append("--verbose")
     result = subprocess.run(
         cmd,
-        input=json.dumps(payload, ensure_ascii=True),
-        text=True,
+        input=data,
     )
     return result.returncode
 
@@ -609,6 +1537,12 @@ def run_cdp_mode(args):
                 return 1
             context = browser.contexts[0] if browser.contexts else browser.new_context()
             page = context.pages[0] if context.pages else context.new_page()
+            page.route(
+                "**/*",
+                lambda route: route.abort()
+                if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+                else route.continue_(),
+            )
 
             # Navigate to email settings
             log(f"Navigating to {args.email_url}", args.verbose)
@@ -621,34 +1555,15 @@ def run_cdp_mode(args):
                 print("{}")
                 return 1
 
-            # Get email - try textbox with exact label match
+            # Get email - every label alternative is tried in one in-page probe
             email = None
             try:
-                # Try playwright role selector - exact match
-                email_input = page.get_by_role("textbox", name=args.email_label)
-                email = email_input.input_value(timeout=5000)
-                log(f"Found email using role selector", args.verbose)
+                email = page.wait_for_function(
+                    f"({email_probe_js(args.email_label)})()",
+                    timeout=int(args.timeout * 1000),
+                ).json_value()
             except Exception:
-                # Fallback: try various XPath approaches
-                label = args.email_label
-                xpaths = [
-                    f"//*[@aria-label='{label}']",
-                    f"//*[@placeholder='{label}']",
-                    f"//label[normalize-space()='{label}']/following::input[1]",
-                    f"//label[normalize-space()='{label}']/following::textarea[1]",
-                    f"//*[normalize-space()='{label}']/following::input[1]",
-                    f"//*[normalize-space()='{label}']/following::textarea[1]",
-                ]
-
-                for xpath in xpaths:
-                    try:
-                        email_input = page.locator(f"xpath={xpath}").first
-                        email = email_input.input_value(timeout=5000)
-                        if email:
-                            log(f"Found email using: {xpath}", args.verbose)
-                            break
-                    except Exception:
-                        continue
+                pass
 
             if not email:
                 logger.error("Failed to get email")
@@ -669,13 +1584,9 @@ def run_cdp_mode(args):
                 print("{}")
                 return 1
 
-            # Get main content
-            main = page.locator("main").first
-            main_text = main.inner_text()
-            Path(logfile).write_text(main_text, encoding="utf-8")
-
-            # Parse usage
-            parsed = parse_usage_text(main_text)
+            # Extract usage in the page; the full text is fetched only on failure
+            raw = page.evaluate(usage_extract_js("Plan usage limits"))
+            parsed = resolve_usage(raw, lambda: page.locator("main").first.inner_text(), logfile)
             if not parsed["session_used"] or not parsed["weekly_used"]:
                 logger.error(
                     f"Failed to parse usage data. session_used={parsed['session_used']}, weekly_used={parsed['weekly_used']}, logfile={logfile}"
@@ -697,8 +1608,9 @@ def run_cdp_mode(args):
                 "logfile": logfile,
             }
 
-            # Output JSON
-            print(json.dumps(payload, ensure_ascii=True))
+            # Output JSON; the same line goes to the logger
+            line = _dumps(payload)
+            print(line)
 
             # Check for recovery alert
             alert_type = should_send_alert("ok", None)
@@ -714,7 +1626,7 @@ def run_cdp_mode(args):
             save_state("ok", None)
 
             # Log to DB
-            log_to_db(payload, args.verbose)
+            log_to_db(line, args.verbose)
 
             return 0
 
@@ -737,6 +1649,11 @@ def main():
         description="Collect Claude usage via Selenium or CDP."
     )
     parser.add_argument("--cdp", action="store_true", help="Use CDP mode.")
+    parser.add_argument(
+        "--selenium",
+        action="store_true",
+        help="Scrape through Selenium/ChromeDriver instead of a direct CDP connection.",
+    )
     parser.add_argument(
         "--cdp-endpoint",
         default=os.environ.get("CDP_ENDPOINT", DEFAULT_CDP_ENDPOINT),
@@ -745,7 +1662,7 @@ def main():
     parser.add_argument(
         "--profile",
         default=os.environ.get("CHROME_PROFILE", DEFAULT_CHROME_PROFILE),
-        help="Chrome user data dir for Selenium.",
+        help="Chrome user data dir.",
     )
     parser.add_argument(
         "--outdir",
@@ -773,9 +1690,23 @@ def main():
         default=default_timeout,
         help="Timeout in seconds.",
     )
+    parser.add_argument(
+        "--persistent",
+        action="store_true",
+        help="With --selenium, start the background Chrome so later runs attach to it.",
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the background Chrome and exit.",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose logs.")
     args = parser.parse_args()
 
+    if args.stop:
+        stop_persistent_chrome(str(Path(args.profile).expanduser()))
+        return 0
+
     # Configure Telegram handler with verbose flag
     if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
         telegram_handler = TelegramErrorHandler(level=logging.ERROR, verbose=args.verbose)
@@ -787,25 +1718,43 @@ def main():
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
     profile_dir = str(Path(args.profile).expanduser())
+    chrome_bin = None if args.selenium else find_chrome_binary()
+    if not args.selenium and not chrome_bin:
+        log("Chrome binary not found; falling back to Selenium.", args.verbose)
+    if args.selenium and args.persistent:
+        persistent_bin = find_chrome_binary()
+        if persistent_bin:
+            ensure_chrome(persistent_bin, profile_dir, args.timeout, args.verbose)
+        else:
+            log("Chrome binary not found; --persistent ignored.", args.verbose)
 
     attempts = 0
     login_attempted = False
+    login_result = None
     while attempts < 2:
         attempts += 1
-        result = scrape_with_selenium(
+        scrape = (
+            functools.partial(scrape_with_cdp, chrome_bin)
+            if chrome_bin
+            else scrape_with_selenium
+        )
+        # A scrape finished in the login browser replaces the headless retry
+        result = login_result or scrape(
             profile_dir=profile_dir,
-            outdir=str(outdir),
+            outdir=outdir,
             email_url=args.email_url,
             usage_url=args.usage_url,
             email_label=args.email_label,
             timeout_s=args.timeout,
             verbose=args.verbose,
         )
+        login_result = None
 
         status = result.get("status")
         if status == "ok":
             payload = result["payload"]
-            print(json.dumps(payload, ensure_ascii=True))
+            line = _dumps(payload)
+            print(line)
 
             # Check for recovery alert
             alert_type = should_send_alert("ok", None)
@@ -820,7 +1769,7 @@ def main():
 
             save_state("ok", None)
 
-            log_status = log_to_db(payload, args.verbose)
+            log_status = log_to_db(line, args.verbose)
             if log_status != 0:
                 return log_status
             return 0
@@ -833,14 +1782,19 @@ def main():
             if snapshot_png:
                 message = f"{message} {snapshot_png}"
             print(message, file=sys.stderr)
-            run_visible_login(
+            # The visible browser needs the profile the background Chrome holds
+            stop_persistent_chrome(profile_dir)
+            login_result = run_visible_login(
                 profile_dir=profile_dir,
+                outdir=outdir,
                 email_url=args.email_url,
+                usage_url=args.usage_url,
                 email_label=args.email_label,
                 timeout_s=args.timeout,
                 verbose=args.verbose,
             )
-            time.sleep(1)
+            if login_result is None:
+                time.sleep(1)
             continue
 
         # Only log actual errors to Telegram (not logout scenarios)
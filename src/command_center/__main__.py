@@ -42,19 +42,23 @@ def parse_date(date_str):
 
     # Try YYYY-MM-DD format
     if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
-        try:
-            datetime.strptime(date_str, '%Y-%m-%d')
-            return date_str
-        except ValueError:
-            raise ValueError(f"Invalid date: {date_str}. Use YYYY-MM-DD or YYYYMMDD format")
-
+        year, month, day = date_str[:4], date_str[5:7], date_str[8:10]
     # Try YYYYMMDD format
-    if len(date_str) == 8 and date_str.isdigit():
+    elif len(date_str) == 8 and date_str.isdigit():
+        year, month, day = date_str[:4], date_str[4:6], date_str[6:8]
+    else:
+        year = month = day = None
+
+    if year is not None:
+        # Checking the fields directly is much cheaper than strptime;
+        # datetime() still rejects impossible calendar dates
         try:
-            dt = datetime.strptime(date_str, '%Y%m%d')
-            return dt.strftime('%Y-%m-%d')
+            if not (year.isdigit() and month.isdigit() and day.isdigit()):
+                raise ValueError
+            datetime(int(year), int(month), int(day))
         except ValueError:
             raise ValueError(f"Invalid date: {date_str}. Use YYYY-MM-DD or YYYYMMDD format")
+        return f"{year}-{month}-{day}"
 
     raise ValueError(f"Invalid date format: {date_str}. Use YYYY-MM-DD or YYYYMMDD format")
 
@@ -154,6 +158,7 @@ def rebuild_database(conn):
     cursor.execute("DROP TABLE IF EXISTS file_tracks")
     cursor.execute("DROP TABLE IF EXISTS message_entries")
     cursor.execute("DROP TABLE IF EXISTS hourly_aggregates")
+    cursor.execute("DROP TABLE IF EXISTS daily_aggregates")
     cursor.execute("DROP TABLE IF EXISTS model_aggregates")
     cursor.execute("DROP TABLE IF EXISTS schema_version")
 
@@ -9,6 +9,9 @@ def get_top_models(conn: sqlite3.Connection, year: int, limit: int = 3) -> List[
     """
     Get top models by token count for a year.
 
+    Served by idx_model_agg_year_tokens, so SQLite seeks the year and reads
+    rows in token order instead of sorting the table.
+
     Args:
         conn: Database connection
         year: Year to query
@@ -2,47 +2,100 @@
 File change detection
 """
 import os
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
 
 from command_center.database.models import FileStatus
 
 
-def detect_file_changes(discovered_files: List[str],
-                       tracked: dict[str, tuple[int, int]]) -> List[FileStatus]:
+# Below this many directories the thread pool costs more than it saves
+_PARALLEL_MIN_DIRS = 8
+_MAX_STAT_WORKERS = 32
+
+
+def _group_by_directory(discovered_files: Iterable[str]) -> dict[str, dict[str, str]]:
+    """Group file paths by parent directory: dirname → {basename: path}, in first-seen order."""
+    groups = {}
+    for file_path in discovered_files:
+        directory, name = os.path.split(file_path)
+        groups.setdefault(directory, {})[name] = file_path
+    return groups
+
+
+def _scan_directory(directory: str, names: dict[str, str]) -> dict[str, os.stat_result]:
+    """Stat the wanted names in one directory from a single os.scandir pass."""
+    stats = {}
+    try:
+        with os.scandir(directory or ".") as entries:
+            for entry in entries:
+                if entry.name in names:
+                    try:
+                        stats[entry.name] = entry.stat()
+                    except OSError:
+                        # Vanished between listing and stat
+                        continue
+    except OSError:
+        # Directory no longer exists or not accessible
+        pass
+    return stats
+
+
+def _iter_directory_stats(
+    groups: dict[str, dict[str, str]]
+) -> Iterator[tuple[dict[str, str], dict[str, os.stat_result]]]:
+    """
+    Yield (paths by basename, stats by basename) for each directory in turn.
+
+    Directories are scanned concurrently when there are many of them; the GIL
+    is released during the syscalls, which overlap on slow or network storage.
+    Results come back in directory order as soon as each scan is done.
+    """
+    if len(groups) < _PARALLEL_MIN_DIRS:
+        for directory, names in groups.items():
+            yield names, _scan_directory(directory, names)
+        return
+
+    workers = min(_MAX_STAT_WORKERS, len(groups))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from zip(groups.values(), executor.map(_scan_directory, groups.keys(), groups.values()))
+
+
+def detect_file_changes(discovered_files: Iterable[str],
+                       tracked: dict[str, tuple[int, int]]) -> Iterator[FileStatus]:
     """
     Detect which files are new, modified, or unchanged.
 
+    Statuses are yielded directory by directory, so callers can start on the
+    first results while later directories are still being scanned.
+
     Args:
-        discovered_files: List of file paths found on filesystem
+        discovered_files: File paths found on filesystem
         tracked: Dict mapping file_path → (mtime_ns, size_bytes) from database
 
-    Returns:
-        List of FileStatus objects
+    Yields:
+        FileStatus for each file that still exists
     """
-    statuses = []
+    for paths_by_name, stats in _iter_directory_stats(_group_by_directory(discovered_files)):
+        for name, file_path in paths_by_name.items():
+            stat = stats.get(name)
+            if stat is None:
+                # File no longer exists or not accessible
+                continue
 
-    for file_path in discovered_files:
-        try:
-            stat = os.stat(file_path)
-        except OSError:
-            # File no longer exists or not accessible
-            continue
-
-        mtime_ns = stat.st_mtime_ns
-        size_bytes = stat.st_size
-
-        if file_path not in tracked:
-            status = "new"
-        elif tracked[file_path] != (mtime_ns, size_bytes):
-            status = "modified"
-        else:
-            status = "unchanged"
-
-        statuses.append(FileStatus(
-            path=file_path,
-            status=status,
-            mtime_ns=mtime_ns,
-            size_bytes=size_bytes
-        ))
-
-    return statuses
+            mtime_ns = stat.st_mtime_ns
+            size_bytes = stat.st_size
+
+            previous = tracked.get(file_path)
+            if previous is None:
+                status = "new"
+            elif previous[0] == mtime_ns and previous[1] == size_bytes:
+                status = "unchanged"
+            else:
+                status = "modified"
+
+            yield FileStatus(
+                path=file_path,
+                status=status,
+                mtime_ns=mtime_ns,
+                size_bytes=size_bytes
+            )
@@ -3,20 +3,59 @@ Incremental update orchestration
 """
 import os
 import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from rich.console import Console
 from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
 
 from command_center.collectors.file_scanner import scan_jsonl_files
-from command_center.collectors.jsonl_parser import parse_jsonl_line
-from command_center.collectors.limit_parser import parse_limit_event, complete_limit_event
+from command_center.collectors.jsonl_parser import parse_jsonl_entry
+from command_center.collectors.limit_parser import parse_limit_event_from_dict, complete_limit_event
+from command_center.database.connection import write_transaction
 from command_center.database.queries import (
-    get_file_tracks, insert_message_entries, insert_limit_events, update_file_track,
-    recompute_hourly_aggregates, recompute_model_aggregates
+    get_file_tracks, insert_message_entries, insert_limit_events, update_file_tracks,
+    get_max_entry_rowid, get_entry_hours_and_years,
+    recompute_hourly_aggregates, recompute_daily_aggregates, recompute_model_aggregates,
+    refresh_model_aggregates_incremental
 )
 from command_center.cache.file_tracker import detect_file_changes
-from command_center.utils.date_helpers import format_datetime_hour, parse_and_convert_to_local
+from command_center.config import BATCH_INSERT_SIZE, PARALLEL_PARSE_MIN_FILES
+from command_center.database.models import FileStatus, LimitEvent, MessageEntry, ParsedFile
+from command_center.utils.date_helpers import format_datetime_hour
 from command_center.utils.project_metadata import (
-    load_projects_json, save_projects_json, auto_discover_project
+    load_projects_json, save_projects_json, auto_discover_projects
 )
+from command_center.utils.json_compat import json_loads
+
+
+@contextmanager
+def _parsed_files(files_to_process: list[FileStatus]) -> Iterator[Iterator[Optional[ParsedFile]]]:
+    """
+    Yield an iterator of parse_file results in the order of files_to_process.
+
+    Results stay in input order so that entries seen in several files keep the
+    same source_file as a serial run.
+    """
+    args = (
+        [fs.path for fs in files_to_process],
+        [fs.mtime_ns for fs in files_to_process],
+        [fs.size_bytes for fs in files_to_process],
+    )
+
+    workers = min(os.cpu_count() or 1, len(files_to_process))
+    if len(files_to_process) < PARALLEL_PARSE_MIN_FILES or workers < 2:
+        yield map(parse_file, *args)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        chunksize = max(1, len(files_to_process) // (workers * 4))
+        yield executor.map(parse_file, *args, chunksize=chunksize)
+    finally:
+        executor.shutdown(cancel_futures=True)
 
 
 def perform_incremental_update(conn: sqlite3.Connection,
@@ -41,71 +80,91 @@ def perform_incremental_update(conn: sqlite3.Connection,
     if not discovered_files:
         return 0
 
-    # Detect changes
-    if force_rescan:
-        # Treat all files as new
-        files_to_process = discovered_files
-    else:
-        tracked = get_file_tracks(conn)
-        file_statuses = detect_file_changes(discovered_files, tracked)
+    # Detect changes, parse files (in worker processes when there are many),
+    # write them serially with progress bar (always shown), then refresh the
+    # aggregates. All of it is one transaction: entries and aggregates commit
+    # together or not at all. Workers start before the progress thread.
+    console = Console() if verbose else None
+    with write_transaction(conn):
+        # File tracks and the rowid mark are read under the write lock, so rows
+        # another updater committed meanwhile are neither re-parsed nor added
+        # to the model totals twice. With nothing tracked (forced rescan) every
+        # file is new; statuses carry the stat used for file tracking.
+        tracked = {} if force_rescan else get_file_tracks(conn)
         files_to_process = [
-            fs.path for fs in file_statuses
+            fs for fs in detect_file_changes(discovered_files, tracked)
             if fs.status in ("new", "modified")
         ]
 
-    if not files_to_process:
-        return 0
-
-    # Load project metadata at start
-    projects = load_projects_json()
-
-    # Track affected hours, years, and discovered projects
-    affected_hours = set()
-    affected_years = set()
-    discovered_project_ids = set()
-
-    # Process files with progress bar (always shown)
-    with Progress(
-        TextColumn("[bold blue]Processing files..."),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        TimeRemainingColumn(),
-    ) as progress:
-        task = progress.add_task("Processing", total=len(files_to_process))
-
-        for file_path in files_to_process:
-            entry_count = process_file(
-                conn, file_path, affected_hours, affected_years, discovered_project_ids
-            )
-            progress.update(task, advance=1)
-
-            # Verbose: show details for each file
-            if verbose and entry_count > 0:
-                progress.console.print(f"  [dim]Processed {entry_count} entries from {os.path.basename(file_path)}[/dim]")
-
-    # Recompute aggregates for affected hours/years
-    if affected_hours:
-        if verbose:
-            from rich.console import Console
-            Console().print(f"[dim]Recomputing hourly aggregates for {len(affected_hours)} hours...[/dim]")
-        recompute_hourly_aggregates(conn, affected_hours)
-
-    if affected_years:
-        if verbose:
-            from rich.console import Console
-            Console().print(f"[dim]Recomputing model aggregates for years: {sorted(affected_years)}[/dim]")
-        for year in affected_years:
-            recompute_model_aggregates(conn, year)
+        if not files_to_process:
+            return 0
+
+        # Affected hours and years are read back from the rows inserted after
+        # this point (every row on a forced rescan)
+        last_rowid = 0 if force_rescan else get_max_entry_rowid(conn)
+
+        # Load project metadata at start
+        projects = load_projects_json()
+        discovered_project_ids = set()
+
+        with _parsed_files(files_to_process) as results, Progress(
+            TextColumn("[bold blue]Processing files..."),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TimeRemainingColumn(),
+        ) as progress:
+            task = progress.add_task("Processing", total=len(files_to_process))
+
+            pending_entries = []
+            pending_tracks = []
+
+            for file_status, parsed in zip(files_to_process, results):
+                entry_count = 0
+                if parsed is not None:
+                    discovered_project_ids |= parsed.project_ids
+                    entry_count = commit_file(conn, parsed, pending_entries, pending_tracks)
+                    if len(pending_entries) >= BATCH_INSERT_SIZE:
+                        insert_message_entries(conn, pending_entries)
+                        pending_entries.clear()
+                progress.update(task, advance=1)
+
+                # Verbose: show details for each file
+                if verbose and entry_count > 0:
+                    progress.console.print(f"  [dim]Processed {entry_count} entries from {os.path.basename(file_status.path)}[/dim]")
+
+            insert_message_entries(conn, pending_entries)
+            update_file_tracks(conn, pending_tracks)
+
+        # New rows only add to the model totals
+        if not force_rescan:
+            refresh_model_aggregates_incremental(conn, last_rowid)
+
+        # Recompute aggregates for affected hours/years
+        affected_hours, affected_years = get_entry_hours_and_years(conn, last_rowid)
+        if affected_hours:
+            if verbose:
+                console.print(f"[dim]Recomputing hourly aggregates for {len(affected_hours)} hours...[/dim]")
+            recompute_hourly_aggregates(conn, affected_hours)
+            recompute_daily_aggregates(conn, {datetime_hour[:10] for datetime_hour in affected_hours})
+
+        if affected_years:
+            if force_rescan:
+                # Full rebuild of every affected year
+                if verbose:
+                    console.print(f"[dim]Recomputing model aggregates for years: {sorted(affected_years)}[/dim]")
+                for year in affected_years:
+                    recompute_model_aggregates(conn, year)
+            elif verbose:
+                console.print(f"[dim]Updated model aggregates for years: {sorted(affected_years)}[/dim]")
 
     # Auto-discover new projects and save metadata
     if discovered_project_ids:
-        for project_id in discovered_project_ids:
-            projects = auto_discover_project(projects, project_id)
+        # Projects are updated in memory; this is the run's only write of the file
+        projects = auto_discover_projects(projects, discovered_project_ids)
         save_projects_json(projects)
 
         if verbose:
-            from rich.console import Console
-            Console().print(f"[dim]Discovered {len(discovered_project_ids)} projects[/dim]")
+            console.print(f"[dim]Discovered {len(discovered_project_ids)} projects[/dim]")
 
     return len(files_to_process)
 
@@ -117,6 +176,7 @@ def process_file(conn: sqlite3.Connection, file_path: str,
     Process a single .jsonl file.
 
     Collects both message entries and limit events from the file.
+    Writes are left uncommitted for the caller to commit.
 
     Args:
         conn: Database connection
@@ -128,106 +188,196 @@ def process_file(conn: sqlite3.Connection, file_path: str,
     Returns:
         Number of valid entries processed
     """
-    import json
+    parsed = parse_file(file_path)
+    if parsed is None:
+        return 0
 
-    entries = []
-    all_lines = []  # Store all parsed lines for limit processing
-    entry_count = 0
+    for entry in parsed.entries:
+        affected_hours.add(format_datetime_hour(entry.dt_local))
+        affected_years.add(entry.year)
+    discovered_project_ids |= parsed.project_ids
+    return commit_file(conn, parsed)
+
+
+def parse_file(file_path: str, mtime_ns: Optional[int] = None,
+               size_bytes: Optional[int] = None) -> Optional[ParsedFile]:
+    """
+    Parse a single .jsonl file without touching the database.
+
+    Safe to run in a worker process; commit_file writes the result.
+
+    Args:
+        file_path: Path to .jsonl file
+        mtime_ns: File mtime from change detection (stat'ed here if omitted)
+        size_bytes: File size from change detection
+
+    Returns:
+        ParsedFile, or None if the file could not be read
+    """
+    parsed = ParsedFile(file_path=file_path, mtime_ns=mtime_ns, size_bytes=size_bytes)
+    entries = parsed.entries
+
+    # Limit events in file order; None holds the place of one still pending
+    completed_limits = []
+    # Old-format events waiting for a later timestamp:
+    # (slot in completed_limits, partial event, last line index to search, fallback)
+    pending_limits = deque()
+    # (line index, timestamp, session_id) of the latest line with a timestamp
+    last_timestamped = None
+    index = 0
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line_stripped = line.strip()
-                if not line_stripped:
-                    continue
-
-                try:
-                    data = json.loads(line_stripped)
-                    all_lines.append(data)
-                except:
-                    continue
-
-                # Try to parse as message entry
-                entry = parse_jsonl_line(line, file_path)
-                if entry:
-                    entries.append(entry)
-                    entry_count += 1
-
-                    # Track affected hour and year
-                    dt_local = parse_and_convert_to_local(entry.timestamp)
-                    if dt_local:
-                        datetime_hour = format_datetime_hour(dt_local)
-                        affected_hours.add(datetime_hour)
-                        affected_years.add(entry.year)
-
-                    # Track discovered project
-                    if entry.project_id and entry.project_id != 'unknown':
-                        discovered_project_ids.add(entry.project_id)
-    except Exception:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError:
         # File read error - skip
-        return 0
+        return None
+
+    for line in content.split(b'\n'):
+        # The decoder ignores surrounding whitespace such as CRLF's \r
+        if not line:
+            continue
+
+        try:
+            data = json_loads(line)
+        except ValueError:
+            # Malformed JSON, or invalid UTF-8
+            continue
+
+        try:
+            # Try to parse as message entry
+            entry = parse_jsonl_entry(data, file_path)
+            if entry:
+                entries.append(entry)
+
+                # Track discovered project
+                if entry.project_id and entry.project_id != 'unknown':
+                    parsed.project_ids.add(entry.project_id)
+
+            timestamp = data.get('timestamp')
+
+            # Events that found no timestamp in the lines after them use the
+            # latest one before them instead
+            while pending_limits and pending_limits[0][2] < index:
+                slot, limit_event, _, fallback = pending_limits.popleft()
+                _complete_limit_slot(completed_limits, slot, limit_event, fallback)
+
+            # The first timestamped line after an event completes it
+            if timestamp:
+                while pending_limits:
+                    slot, limit_event, _, _ = pending_limits.popleft()
+                    _complete_limit_slot(completed_limits, slot, limit_event,
+                                         (timestamp, data.get('sessionId')))
+
+            # Limit events carry type "summary" or error "rate_limit"; a substring
+            # test on the raw bytes rules out nearly every other line cheaply
+            if b'"summary"' in line or b'"rate_limit"' in line:
+                _collect_limit_event(data, file_path, index, last_timestamped,
+                                     completed_limits, pending_limits)
+
+            if timestamp:
+                last_timestamped = (index, timestamp, data.get('sessionId'))
+            index += 1
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            # Valid JSON but not the expected shape (e.g. not an object, or a
+            # timestamp/number that does not convert) - skip the line
+            continue
+
+    # No timestamped line followed before the end of the file
+    for slot, limit_event, _, fallback in pending_limits:
+        _complete_limit_slot(completed_limits, slot, limit_event, fallback)
+
+    parsed.limit_events = [event for event in completed_limits if event is not None]
+
+    if parsed.mtime_ns is None:
+        try:
+            stat = os.stat(file_path)
+            parsed.mtime_ns = stat.st_mtime_ns
+            parsed.size_bytes = stat.st_size
+        except OSError:
+            pass
+
+    return parsed
+
+
+def _collect_limit_event(data: dict, file_path: str, index: int,
+                         last_timestamped: Optional[tuple[int, str, Optional[str]]],
+                         completed_limits: list[Optional[LimitEvent]],
+                         pending_limits: deque):
+    """
+    Record the limit event on line `index`, if any (old summary format OR new error format).
 
-    # Insert message entries
-    if entries:
-        insert_message_entries(conn, entries)
+    An event without its own timestamp takes the one from the NEXT line with a
+    timestamp within 9 lines, else from the latest one within the 10 lines before.
+    """
+    is_old_format = data.get('type') == 'summary'
+    is_new_format = (data.get('type') == 'assistant' and data.get('error') == 'rate_limit')
 
-    # Process limit events from summary entries OR assistant error messages
-    completed_limits = []
+    if not (is_old_format or is_new_format):
+        return
 
-    for i, data in enumerate(all_lines):
-        # Check if this is a limit event (old summary format OR new error format)
-        is_old_format = data.get('type') == 'summary'
-        is_new_format = (data.get('type') == 'assistant' and data.get('error') == 'rate_limit')
-
-        if is_old_format or is_new_format:
-            limit_event = parse_limit_event(json.dumps(data), file_path)
-            if limit_event:
-                # For new format, parse_limit_event already completed the event
-                # (timestamp is in the same entry)
-                if is_new_format and limit_event.occurred_at:
-                    # Event already completed
-                    completed_limits.append(limit_event)
-                    continue
-
-                # For old format, find the NEXT message entry with timestamp
-                timestamp = None
-                session_id = None
-
-                for j in range(i + 1, min(i + 10, len(all_lines))):
-                    next_data = all_lines[j]
-                    if next_data.get('timestamp'):
-                        timestamp = next_data.get('timestamp')
-                        session_id = next_data.get('sessionId')
-                        break
-
-                # If no next entry, use previous entry
-                if not timestamp:
-                    for j in range(max(0, i - 10), i):
-                        prev_data = all_lines[j]
-                        if prev_data.get('timestamp'):
-                            timestamp = prev_data.get('timestamp')
-                            session_id = prev_data.get('sessionId')
-
-                if timestamp:
-                    try:
-                        completed = complete_limit_event(
-                            limit_event,
-                            timestamp,
-                            session_id
-                        )
-                        completed_limits.append(completed)
-                    except Exception as e:
-                        # Skip invalid limit events
-                        pass
-
-    if completed_limits:
-        insert_limit_events(conn, completed_limits)
+    limit_event = parse_limit_event_from_dict(data, file_path)
+    if not limit_event:
+        return
+
+    # For new format, parse_limit_event_from_dict already completed the event
+    # (timestamp is in the same entry)
+    if is_new_format and limit_event.occurred_at:
+        completed_limits.append(limit_event)
+        return
+
+    fallback = None
+    if last_timestamped and last_timestamped[0] >= index - 10:
+        fallback = last_timestamped[1:]
+
+    completed_limits.append(None)
+    pending_limits.append((len(completed_limits) - 1, limit_event, index + 9, fallback))
+
+
+def _complete_limit_slot(completed_limits: list[Optional[LimitEvent]], slot: int,
+                         limit_event: LimitEvent,
+                         found: Optional[tuple[str, Optional[str]]]):
+    """Fill a pending slot from a (timestamp, session_id) pair; events without one are dropped."""
+    if not found:
+        return
 
-    # Update file tracking
     try:
-        stat = os.stat(file_path)
-        update_file_track(conn, file_path, stat.st_mtime_ns, stat.st_size, entry_count)
-    except OSError:
+        completed_limits[slot] = complete_limit_event(limit_event, found[0], found[1])
+    except (ValueError, OverflowError):
+        # Skip invalid limit events
         pass
 
+
+def commit_file(conn: sqlite3.Connection, parsed: ParsedFile,
+                pending_entries: Optional[list[MessageEntry]] = None,
+                pending_tracks: Optional[list[tuple[str, int, int, int]]] = None) -> int:
+    """
+    Write one parse_file result; the caller commits.
+
+    When pending_entries / pending_tracks are given, message entries / file
+    tracking rows are appended to them instead, so the caller can write many
+    files' worth at once.
+
+    Returns:
+        Number of message entries in the file
+    """
+    entry_count = len(parsed.entries)
+
+    # Insert message entries
+    if pending_entries is not None:
+        pending_entries.extend(parsed.entries)
+    elif parsed.entries:
+        insert_message_entries(conn, parsed.entries)
+
+    if parsed.limit_events:
+        insert_limit_events(conn, parsed.limit_events)
+
+    # Update file tracking
+    if parsed.mtime_ns is not None:
+        track = (parsed.file_path, parsed.mtime_ns, parsed.size_bytes, entry_count)
+        if pending_tracks is not None:
+            pending_tracks.append(track)
+        else:
+            update_file_tracks(conn, [track])
+
     return entry_count
@@ -1,17 +1,17 @@
 """
 JSONL parsing with UTC to local time conversion
 """
-import json
-from typing import Optional
+from typing import Optional, Union
 
 from command_center.database.models import MessageEntry
 from command_center.utils.date_helpers import parse_and_convert_to_local, format_datetime_hour, format_date_key
 from command_center.collectors.deduplication import compute_entry_hash
 from command_center.utils.pricing import get_model_pricing, calculate_cost_usd
 from command_center.utils.project_helpers import extract_project_id
+from command_center.utils.json_compat import json_loads
 
 
-def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
+def parse_jsonl_line(line: Union[str, bytes], source_file: str) -> Optional[MessageEntry]:
     """
     Parse a single JSONL line into MessageEntry.
 
@@ -19,7 +19,7 @@ def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
     Extracts project_id from source file path.
 
     Args:
-        line: Raw JSONL line
+        line: Raw JSONL line (str, or bytes as read from the file)
         source_file: Path to source .jsonl file
 
     Returns:
@@ -30,20 +30,35 @@ def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
         return None
 
     try:
-        entry = json.loads(line)
-    except json.JSONDecodeError:
+        entry = json_loads(line)
+    except ValueError:
+        # JSONDecodeError, or invalid UTF-8 in bytes input
         return None
 
-    # Compute hash for deduplication
-    entry_hash = compute_entry_hash(entry)
-    if not entry_hash:
-        return None
+    return parse_jsonl_entry(entry, source_file)
+
+
+def parse_jsonl_entry(entry: dict, source_file: str) -> Optional[MessageEntry]:
+    """
+    Build a MessageEntry from an already decoded JSONL line.
+
+    Args:
+        entry: Decoded JSONL object
+        source_file: Path to source .jsonl file
 
-    # Parse timestamp (UTC)
+    Returns:
+        MessageEntry or None if the entry is not a usable message
+    """
+    # Parse timestamp (UTC); checked first, as most non-message lines lack one
     timestamp = entry.get('timestamp')
     if not timestamp:
         return None
 
+    # Compute hash for deduplication
+    entry_hash = compute_entry_hash(entry)
+    if not entry_hash:
+        return None
+
     # Convert to local time
     dt_local = parse_and_convert_to_local(timestamp)
     if dt_local is None:
@@ -57,8 +72,10 @@ def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
     # Extract project_id from file path
     project_id = extract_project_id(source_file)
 
+    message = entry.get('message', {})
+
     # Extract tokens
-    usage = entry.get('message', {}).get('usage', {})
+    usage = message.get('usage', {})
     input_tokens = usage.get('input_tokens', 0) or 0
     output_tokens = usage.get('output_tokens', 0) or 0
     cache_read = usage.get('cache_read_input_tokens', 0) or 0
@@ -68,7 +85,7 @@ def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
     # Calculate cost if not provided in JSONL
     cost_usd = entry.get('costUSD')
     if cost_usd is None:
-        model = entry.get('message', {}).get('model')
+        model = message.get('model')
         if model:
             try:
                 pricing = get_model_pricing(model)
@@ -93,8 +110,8 @@ def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
         date=date,
         session_id=entry.get('sessionId'),
         request_id=entry.get('requestId'),
-        message_id=entry.get('message', {}).get('id'),
-        model=entry.get('message', {}).get('model'),
+        message_id=message.get('id'),
+        model=message.get('model'),
         cost_usd=cost_usd,
         input_tokens=input_tokens,
         output_tokens=output_tokens,
@@ -102,5 +119,6 @@ def parse_jsonl_line(line: str, source_file: str) -> Optional[MessageEntry]:
         cache_write_tokens=cache_write,
         total_tokens=total_tokens,
         source_file=source_file,
-        project_id=project_id
+        project_id=project_id,
+        dt_local=dt_local
     )
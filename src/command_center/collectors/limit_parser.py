@@ -1,13 +1,33 @@
 """
 Parser for session limit events from JSONL summary entries
 """
-import json
 import re
 from datetime import datetime, timedelta
 from typing import Optional
 
 from command_center.database.models import LimitEvent
 from command_center.utils.date_helpers import parse_and_convert_to_local, format_date_key
+from command_center.utils.json_compat import json_loads
+
+# "resets HH{am|pm}" with optional timezone in parentheses
+_RESET_HOUR_RE = re.compile(r'resets (\d+)(am|pm)(?:\s*\([^)]+\))?', re.IGNORECASE)
+# "resets Dec 12, 1pm" (spending cap format)
+_RESET_DATE_RE = re.compile(r'resets ([A-Za-z]+) (\d+),?\s*(\d+)(am|pm)', re.IGNORECASE)
+# Reset text runs up to the separator: "∙" in summaries, "·" in error messages
+_SUMMARY_RESET_TEXT_RE = re.compile(r'resets [^∙]+', re.IGNORECASE)
+_ERROR_RESET_TEXT_RE = re.compile(r'resets [^·]+', re.IGNORECASE)
+
+# Limit type phrases, checked in this order by classify_limit_type
+_FIVE_HOUR_LIMIT_RE = re.compile(r'5-hour limit', re.IGNORECASE)
+_SESSION_LIMIT_RE = re.compile(r'session limit', re.IGNORECASE)
+_SPENDING_CAP_RE = re.compile(r'spending cap', re.IGNORECASE)
+# Also matches 'api context limit'
+_CONTEXT_LIMIT_RE = re.compile(r'context limit', re.IGNORECASE)
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
 
 
 def parse_reset_time(occurred_at_local: datetime, reset_text: str) -> datetime:
@@ -27,7 +47,7 @@ def parse_reset_time(occurred_at_local: datetime, reset_text: str) -> datetime:
     """
     # Try pattern: "resets HH{am|pm}" with optional timezone in parentheses
     # Examples: "resets 1am", "resets 1am (Europe/Warsaw)", "resets 12pm (UTC)"
-    match = re.search(r'resets (\d+)(am|pm)(?:\s*\([^)]+\))?', reset_text, re.IGNORECASE)
+    match = _RESET_HOUR_RE.search(reset_text)
     if match:
         hour_12 = int(match.group(1))
         period = match.group(2).lower()
@@ -54,7 +74,7 @@ def parse_reset_time(occurred_at_local: datetime, reset_text: str) -> datetime:
         return reset_dt
 
     # Try pattern: "resets Dec 12, 1pm" (spending cap format)
-    match = re.search(r'resets ([A-Za-z]+) (\d+),?\s*(\d+)(am|pm)', reset_text, re.IGNORECASE)
+    match = _RESET_DATE_RE.search(reset_text)
     if match:
         month_name = match.group(1)
         day = int(match.group(2))
@@ -68,11 +88,7 @@ def parse_reset_time(occurred_at_local: datetime, reset_text: str) -> datetime:
             reset_hour = 12 if hour_12 == 12 else hour_12 + 12
 
         # Parse month name
-        month_map = {
-            'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-            'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
-        }
-        month = month_map.get(month_name.lower()[:3], occurred_at_local.month)
+        month = _MONTHS.get(month_name.lower()[:3], occurred_at_local.month)
 
         # Determine year (might be next year if month/day already passed)
         year = occurred_at_local.year
@@ -101,15 +117,13 @@ def classify_limit_type(summary_text: str) -> Optional[str]:
     Returns:
         '5-hour', 'session', 'spending_cap', 'context', or None
     """
-    text_lower = summary_text.lower()
-
-    if '5-hour limit' in text_lower:
+    if _FIVE_HOUR_LIMIT_RE.search(summary_text):
         return '5-hour'
-    elif 'session limit' in text_lower:
+    elif _SESSION_LIMIT_RE.search(summary_text):
         return 'session'
-    elif 'spending cap' in text_lower:
+    elif _SPENDING_CAP_RE.search(summary_text):
         return 'spending_cap'
-    elif 'context limit' in text_lower or 'api context limit' in text_lower:
+    elif _CONTEXT_LIMIT_RE.search(summary_text):
         return 'context'
     else:
         return None
@@ -135,10 +149,25 @@ def parse_limit_event(line: str, source_file: str) -> Optional[LimitEvent]:
         return None
 
     try:
-        entry = json.loads(line)
-    except json.JSONDecodeError:
+        entry = json_loads(line)
+    except ValueError:
+        # JSONDecodeError, or invalid UTF-8 in bytes input
         return None
 
+    return parse_limit_event_from_dict(entry, source_file)
+
+
+def parse_limit_event_from_dict(entry: dict, source_file: str) -> Optional[LimitEvent]:
+    """
+    Parse an already decoded JSONL line for limit event; see parse_limit_event.
+
+    Args:
+        entry: Decoded JSONL object
+        source_file: Path to source .jsonl file
+
+    Returns:
+        LimitEvent or None if not a limit event
+    """
     # Check for OLD format: summary entry with limit information
     if entry.get('type') == 'summary':
         summary_text = entry.get('summary', '')
@@ -156,7 +185,7 @@ def parse_limit_event(line: str, source_file: str) -> Optional[LimitEvent]:
             return None
 
         # Extract reset text
-        reset_match = re.search(r'resets [^∙]+', summary_text, re.IGNORECASE)
+        reset_match = _SUMMARY_RESET_TEXT_RE.search(summary_text)
         reset_text = reset_match.group(0) if reset_match else None
 
         # Return partial event (timestamp will be filled by pipeline)
@@ -204,7 +233,7 @@ def parse_limit_event(line: str, source_file: str) -> Optional[LimitEvent]:
             return None
 
         # Extract reset text (e.g., "resets 1am (Europe/Warsaw)")
-        reset_match = re.search(r'resets [^·]+', summary_text, re.IGNORECASE)
+        reset_match = _ERROR_RESET_TEXT_RE.search(summary_text)
         reset_text = reset_match.group(0).strip() if reset_match else None
 
         # For new format, timestamp is in the same entry!
@@ -232,7 +261,8 @@ def parse_limit_event(line: str, source_file: str) -> Optional[LimitEvent]:
                     timestamp,
                     session_id
                 )
-            except:
+            except (ValueError, OverflowError):
+                # Invalid timestamp or reset time
                 return None
         else:
             # No timestamp - return partial event
@@ -48,4 +48,5 @@ FONT_PATHS = [
 ]
 
 # Batch processing
-BATCH_INSERT_SIZE = 100  # Insert entries in batches of 100
+BATCH_INSERT_SIZE = 10000  # Rows per flush; statements are clamped to the SQLite variable limit
+PARALLEL_PARSE_MIN_FILES = 16  # Fewer files are parsed in-process
@@ -1,12 +1,17 @@
 """
 Database connection management
 """
-import sqlite3
 import os
 from contextlib import contextmanager
+from pathlib import Path
 from typing import Generator
 
 from command_center.config import DB_PATH
+from command_center.utils.sqlite_compat import sqlite3
+
+# Prepared statements kept per connection (sqlite3 defaults to 128); queries.py
+# reuses canonical SQL strings, so repeated calls skip parsing and planning
+CACHED_STATEMENTS = 256
 
 
 def ensure_db_directory():
@@ -30,7 +35,7 @@ def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
     """
     ensure_db_directory()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, cached_statements=CACHED_STATEMENTS)
 
     # Enable WAL mode for better concurrent access
     conn.execute("PRAGMA journal_mode=WAL")
@@ -41,6 +46,15 @@ def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
     # Enable foreign keys (if we add them in future)
     conn.execute("PRAGMA foreign_keys=ON")
 
+    # Bulk updates and repeated aggregate queries: temp b-trees in memory,
+    # 64 MiB page cache, 256 MB mmap reads
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
+
+    # Wait up to 5 s for another writer (e.g. the app refreshing while the CLI runs)
+    conn.execute("PRAGMA busy_timeout=5000")
+
     try:
         yield conn
     finally:
@@ -59,9 +73,78 @@ def get_db_connection_no_context() -> sqlite3.Connection:
     """
     ensure_db_directory()
 
-    conn = sqlite3.Connection(DB_PATH)
+    conn = sqlite3.Connection(DB_PATH, cached_statements=CACHED_STATEMENTS)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+    return conn
+
+
+def get_readonly_connection_no_context() -> sqlite3.Connection:
+    """
+    Open the database read-only (mode=ro), for paths that only query.
+
+    The connection never takes the write lock, so it cannot hold up or be
+    blocked by the writer; WAL readers see the last committed snapshot.
+    The database must already exist.
+
+    Returns:
+        sqlite3.Connection with read-side settings
+
+    Raises:
+        sqlite3.OperationalError: If the database file cannot be opened
+    """
+    uri = Path(DB_PATH).as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, cached_statements=CACHED_STATEMENTS)
+
+    # journal_mode and synchronous belong to the writer; keep the read tuning
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA busy_timeout=5000")
 
     return conn
+
+
+@contextmanager
+def get_readonly_connection() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Get a read-only database connection.
+
+    Usage:
+        with get_readonly_connection() as conn:
+            stats = query_usage_stats(conn, date_from, date_to)
+    """
+    conn = get_readonly_connection_no_context()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection) -> Generator[sqlite3.Connection, None, None]:
+    """
+    Run a block of writes as one explicit transaction.
+
+    BEGIN IMMEDIATE takes the write lock up front, so a long batch cannot fail
+    halfway with SQLITE_BUSY while upgrading from a read lock. Commits when the
+    block finishes, rolls back if it raises.
+
+    Usage:
+        with write_transaction(conn):
+            insert_message_entries(conn, entries)
+            update_file_tracks(conn, tracks)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
@@ -1,12 +1,12 @@
 """
 Data models for database entities
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Literal
 
 
-@dataclass
+@dataclass(slots=True)
 class FileTrack:
     """Tracks which files have been processed"""
     file_path: str
@@ -16,7 +16,7 @@ class FileTrack:
     entry_count: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageEntry:
     """Individual message entry from JSONL files"""
     entry_hash: str  # message.id:requestId
@@ -36,9 +36,11 @@ class MessageEntry:
     total_tokens: int = 0
     source_file: str = ""
     project_id: str = "unknown"
+    # Parsed local timestamp, kept so callers need not parse timestamp again (not stored)
+    dt_local: Optional[datetime] = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class HourlyAggregate:
     """Pre-computed hourly statistics (local time)"""
     datetime_hour: str  # YYYY-MM-DD HH:00:00 (local)
@@ -53,7 +55,20 @@ class HourlyAggregate:
     total_cost_usd: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
+class DailyAggregate:
+    """Pre-computed daily statistics (local time)"""
+    date: str  # YYYY-MM-DD
+    year: int
+    month: int
+    day: int
+    message_count: int = 0
+    session_count: int = 0
+    total_tokens: int = 0
+    total_cost_usd: float = 0.0
+
+
+@dataclass(slots=True)
 class ModelAggregate:
     """Pre-computed per-model statistics"""
     model: str
@@ -67,16 +82,16 @@ class ModelAggregate:
     total_cost_usd: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class FileStatus:
-    """Status of a file during change detection"""
+    """Status of a file during change detection (one per scanned file)"""
     path: str
     status: Literal["new", "modified", "unchanged"]
     mtime_ns: int
     size_bytes: int
 
 
-@dataclass
+@dataclass(slots=True)
 class LimitEvent:
     """Session limit event (5-hour limit, spending cap, etc.)"""
     leaf_uuid: str  # Unique identifier for deduplication
@@ -93,7 +108,18 @@ class LimitEvent:
     source_file: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
+class ParsedFile:
+    """Everything process_file writes for one .jsonl file, built without the database"""
+    file_path: str
+    entries: list[MessageEntry] = field(default_factory=list)
+    limit_events: list[LimitEvent] = field(default_factory=list)
+    project_ids: set[str] = field(default_factory=set)
+    mtime_ns: Optional[int] = None  # None when the file could not be stat'ed
+    size_bytes: Optional[int] = None
+
+
+@dataclass(slots=True)
 class UsageStats:
     """Statistics for usage report generation"""
     date_from: str  # YYYY-MM-DD
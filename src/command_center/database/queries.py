@@ -1,14 +1,99 @@
 """
 SQL query interface for database operations
+
+Write functions never commit: they run in the caller's transaction, so a
+whole update commits once. Wrap them in connection.write_transaction().
 """
-import sqlite3
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
 from typing import Optional, Literal
 from datetime import datetime
 
+from command_center.utils.sqlite_compat import sqlite3
+
 from command_center.database.models import MessageEntry, UsageStats, LimitEvent
 from command_center.config import BATCH_INSERT_SIZE
 from command_center.utils.model_names import format_model_name
 
+# Kept as constants so sqlite3's statement cache reuses the prepared statements;
+# _values_sql appends one "(?, ...)" group per row
+_INSERT_MESSAGE_ENTRY_SQL = """
+    INSERT OR IGNORE INTO message_entries
+    (entry_hash, timestamp, timestamp_local, year, date, session_id,
+     request_id, message_id, model, cost_usd, input_tokens, output_tokens,
+     cache_read_tokens, cache_write_tokens, total_tokens, source_file, project_id)
+    VALUES
+"""
+
+_INSERT_LIMIT_EVENT_SQL = """
+    INSERT OR IGNORE INTO limit_events
+    (leaf_uuid, limit_type, occurred_at, occurred_at_local, year, date,
+     hour, reset_at_local, reset_text, session_id, summary_text, source_file)
+    VALUES
+"""
+
+# Host parameter limit of SQLite builds that do not report it (3.32 raised the default)
+_DEFAULT_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+# CTE hint that forces a single evaluation; older SQLite rejects the keyword.
+_MATERIALIZED = "MATERIALIZED " if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+
+# Build each insert row in one C-level call; field order matches the SQL above
+_MESSAGE_ENTRY_ROW = attrgetter(
+    "entry_hash", "timestamp", "timestamp_local", "year", "date",
+    "session_id", "request_id", "message_id", "model", "cost_usd",
+    "input_tokens", "output_tokens", "cache_read_tokens",
+    "cache_write_tokens", "total_tokens", "source_file", "project_id",
+)
+
+_LIMIT_EVENT_ROW = attrgetter(
+    "leaf_uuid", "limit_type", "occurred_at", "occurred_at_local",
+    "year", "date", "hour", "reset_at_local", "reset_text",
+    "session_id", "summary_text", "source_file",
+)
+
+
+def _max_variables(conn: sqlite3.Connection) -> int:
+    """Host parameters allowed per statement on this connection"""
+    getlimit = getattr(conn, "getlimit", None)  # Python 3.11+
+    if getlimit is None:
+        return _DEFAULT_MAX_VARIABLES
+    return getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+
+@lru_cache(maxsize=16)
+def _values_sql(insert_sql: str, n_columns: int, n_rows: int) -> str:
+    """insert_sql followed by n_rows placeholder groups of n_columns each"""
+    group = "(" + ", ".join("?" * n_columns) + ")"
+    return insert_sql + ", ".join([group] * n_rows)
+
+
+def _insert_rows(conn: sqlite3.Connection, insert_sql: str, n_columns: int,
+                 row_getter: attrgetter, items: list):
+    """
+    Insert items with multi-row VALUES statements.
+
+    Each statement carries as many rows as the connection's host parameter
+    limit allows (at most BATCH_INSERT_SIZE), so SQLite is entered once per
+    chunk instead of once per row. The remainder that does not fill a whole
+    statement goes through executemany on the single-row form. Rows are bound
+    in list order, so INSERT OR IGNORE keeps the same first occurrence.
+    """
+    cursor = conn.cursor()
+    rows_per_statement = max(1, min(BATCH_INSERT_SIZE, _max_variables(conn) // n_columns))
+    full = len(items) - len(items) % rows_per_statement
+
+    if full:
+        sql = _values_sql(insert_sql, n_columns, rows_per_statement)
+        for i in range(0, full, rows_per_statement):
+            chunk = items[i:i + rows_per_statement]
+            cursor.execute(sql, list(chain.from_iterable(map(row_getter, chunk))))
+
+    if full < len(items):
+        cursor.executemany(_values_sql(insert_sql, n_columns, 1),
+                           map(row_getter, items[full:]))
+
 
 def insert_message_entries(conn: sqlite3.Connection, entries: list[MessageEntry]):
     """
@@ -19,31 +104,7 @@ def insert_message_entries(conn: sqlite3.Connection, entries: list[MessageEntry]
     if not entries:
         return
 
-    cursor = conn.cursor()
-
-    # Process in batches
-    for i in range(0, len(entries), BATCH_INSERT_SIZE):
-        batch = entries[i:i + BATCH_INSERT_SIZE]
-
-        rows = [
-            (
-                e.entry_hash, e.timestamp, e.timestamp_local, e.year, e.date,
-                e.session_id, e.request_id, e.message_id, e.model, e.cost_usd,
-                e.input_tokens, e.output_tokens, e.cache_read_tokens,
-                e.cache_write_tokens, e.total_tokens, e.source_file, e.project_id
-            )
-            for e in batch
-        ]
-
-        cursor.executemany("""
-            INSERT OR IGNORE INTO message_entries
-            (entry_hash, timestamp, timestamp_local, year, date, session_id,
-             request_id, message_id, model, cost_usd, input_tokens, output_tokens,
-             cache_read_tokens, cache_write_tokens, total_tokens, source_file, project_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, rows)
-
-    conn.commit()
+    _insert_rows(conn, _INSERT_MESSAGE_ENTRY_SQL, 17, _MESSAGE_ENTRY_ROW, entries)
 
 
 def insert_limit_events(conn: sqlite3.Connection, events: list[LimitEvent]):
@@ -55,41 +116,37 @@ def insert_limit_events(conn: sqlite3.Connection, events: list[LimitEvent]):
     if not events:
         return
 
-    cursor = conn.cursor()
+    _insert_rows(conn, _INSERT_LIMIT_EVENT_SQL, 12, _LIMIT_EVENT_ROW, events)
 
-    # Process in batches
-    for i in range(0, len(events), BATCH_INSERT_SIZE):
-        batch = events[i:i + BATCH_INSERT_SIZE]
 
-        rows = [
-            (
-                e.leaf_uuid, e.limit_type, e.occurred_at, e.occurred_at_local,
-                e.year, e.date, e.hour, e.reset_at_local, e.reset_text,
-                e.session_id, e.summary_text, e.source_file
-            )
-            for e in batch
-        ]
+def update_file_track(conn: sqlite3.Connection, file_path: str, mtime_ns: int,
+                      size_bytes: int, entry_count: int):
+    """Update file tracking information"""
+    update_file_tracks(conn, [(file_path, mtime_ns, size_bytes, entry_count)])
 
-        cursor.executemany("""
-            INSERT OR IGNORE INTO limit_events
-            (leaf_uuid, limit_type, occurred_at, occurred_at_local, year, date,
-             hour, reset_at_local, reset_text, session_id, summary_text, source_file)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, rows)
 
-    conn.commit()
+def update_file_tracks(conn: sqlite3.Connection,
+                       tracks: list[tuple[str, int, int, int]]):
+    """
+    Upsert tracking information for many files in one statement.
 
+    Args:
+        tracks: (file_path, mtime_ns, size_bytes, entry_count) per file
+    """
+    if not tracks:
+        return
 
-def update_file_track(conn: sqlite3.Connection, file_path: str, mtime_ns: int,
-                      size_bytes: int, entry_count: int):
-    """Update file tracking information"""
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR REPLACE INTO file_tracks
+    cursor.executemany("""
+        INSERT INTO file_tracks
         (file_path, mtime_ns, size_bytes, last_scanned, entry_count)
         VALUES (?, ?, ?, datetime('now'), ?)
-    """, (file_path, mtime_ns, size_bytes, entry_count))
-    conn.commit()
+        ON CONFLICT(file_path) DO UPDATE SET
+            mtime_ns = excluded.mtime_ns,
+            size_bytes = excluded.size_bytes,
+            last_scanned = excluded.last_scanned,
+            entry_count = excluded.entry_count
+    """, tracks)
 
 
 def get_file_tracks(conn: sqlite3.Connection) -> dict[str, tuple[int, int]]:
@@ -101,7 +158,41 @@ def get_file_tracks(conn: sqlite3.Connection) -> dict[str, tuple[int, int]]:
     """
     cursor = conn.cursor()
     cursor.execute("SELECT file_path, mtime_ns, size_bytes FROM file_tracks")
-    return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    # Build the dict straight from the cursor, without an intermediate row list
+    return {row[0]: (row[1], row[2]) for row in cursor}
+
+
+def get_max_entry_rowid(conn: sqlite3.Connection) -> int:
+    """Get the highest message_entries rowid (0 when empty); later inserts get larger ones."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM message_entries")
+    return cursor.fetchone()[0]
+
+
+def get_entry_hours_and_years(conn: sqlite3.Connection,
+                              after_rowid: int = 0) -> tuple[set[str], set[int]]:
+    """
+    Get the local hours and years covered by message entries.
+
+    Args:
+        after_rowid: Only consider rows inserted after this rowid
+
+    Returns:
+        (set of datetime_hour strings (YYYY-MM-DD HH:00:00), set of years)
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT DISTINCT date || ' ' || SUBSTR(timestamp_local, 12, 2) || ':00:00', year
+        FROM message_entries
+        WHERE rowid > ?
+    """, (after_rowid,))
+
+    datetime_hours = set()
+    years = set()
+    for datetime_hour, year in cursor.fetchall():
+        datetime_hours.add(datetime_hour)
+        years.add(year)
+    return datetime_hours, years
 
 
 def recompute_hourly_aggregates(conn: sqlite3.Connection, datetime_hours: set[str]):
@@ -116,39 +207,98 @@ def recompute_hourly_aggregates(conn: sqlite3.Connection, datetime_hours: set[st
 
     cursor = conn.cursor()
 
-    for datetime_hour in datetime_hours:
-        # Delete existing aggregate
-        cursor.execute("""
-            DELETE FROM hourly_aggregates WHERE datetime_hour = ?
-        """, (datetime_hour,))
+    # Stage the hours in a temp table so all of them are refreshed by one
+    # DELETE and one grouped INSERT...SELECT
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS affected_hours (datetime_hour TEXT PRIMARY KEY)
+    """)
+    cursor.execute("DELETE FROM affected_hours")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO affected_hours (datetime_hour) VALUES (?)",
+        ((datetime_hour,) for datetime_hour in datetime_hours)
+    )
 
-        # Recompute from message_entries
-        # Extract components from datetime_hour parameter
-        parts = datetime_hour.split(' ')
-        date_part = parts[0]  # YYYY-MM-DD
-        hour_part = parts[1][:2]  # HH
+    # Delete existing aggregates
+    cursor.execute("""
+        DELETE FROM hourly_aggregates
+        WHERE datetime_hour IN (SELECT datetime_hour FROM affected_hours)
+    """)
 
-        cursor.execute("""
-            INSERT INTO hourly_aggregates
-            (datetime_hour, year, month, day, hour, date, message_count,
-             session_count, total_tokens, total_cost_usd)
-            SELECT
-                ?,
-                MIN(year) as year,
-                CAST(SUBSTR(?, 6, 2) AS INTEGER) as month,
-                CAST(SUBSTR(?, 9, 2) AS INTEGER) as day,
-                CAST(? AS INTEGER) as hour,
-                ?,
-                COUNT(*) as message_count,
-                COUNT(DISTINCT session_id) as session_count,
-                SUM(total_tokens) as total_tokens,
-                SUM(COALESCE(cost_usd, 0)) as total_cost
-            FROM message_entries
-            WHERE date = ? AND SUBSTR(timestamp_local, 12, 2) = ?
-            HAVING COUNT(*) > 0
-        """, (datetime_hour, datetime_hour, datetime_hour, hour_part, date_part, date_part, hour_part))
+    # Recompute from message_entries; hours without entries stay deleted
+    # Components are extracted from datetime_hour (YYYY-MM-DD HH:00:00)
+    cursor.execute("""
+        INSERT INTO hourly_aggregates
+        (datetime_hour, year, month, day, hour, date, message_count,
+         session_count, total_tokens, total_cost_usd)
+        SELECT
+            h.datetime_hour,
+            MIN(e.year) as year,
+            CAST(SUBSTR(h.datetime_hour, 6, 2) AS INTEGER) as month,
+            CAST(SUBSTR(h.datetime_hour, 9, 2) AS INTEGER) as day,
+            CAST(SUBSTR(h.datetime_hour, 12, 2) AS INTEGER) as hour,
+            SUBSTR(h.datetime_hour, 1, 10) as date,
+            COUNT(*) as message_count,
+            COUNT(DISTINCT e.session_id) as session_count,
+            SUM(e.total_tokens) as total_tokens,
+            TOTAL(e.cost_usd) as total_cost
+        FROM affected_hours h
+        JOIN message_entries e
+            ON e.date = SUBSTR(h.datetime_hour, 1, 10)
+            AND SUBSTR(e.timestamp_local, 12, 2) = SUBSTR(h.datetime_hour, 12, 2)
+        GROUP BY h.datetime_hour
+    """)
 
-    conn.commit()
+    cursor.execute("DELETE FROM affected_hours")
+
+
+def recompute_daily_aggregates(conn: sqlite3.Connection, dates: set[str]):
+    """
+    Recompute daily aggregates for specific dates.
+
+    Args:
+        dates: Set of local dates (YYYY-MM-DD)
+    """
+    if not dates:
+        return
+
+    cursor = conn.cursor()
+
+    # Same staging as recompute_hourly_aggregates
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS affected_dates (date TEXT PRIMARY KEY)
+    """)
+    cursor.execute("DELETE FROM affected_dates")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO affected_dates (date) VALUES (?)",
+        ((date,) for date in dates)
+    )
+
+    cursor.execute("""
+        DELETE FROM daily_aggregates
+        WHERE date IN (SELECT date FROM affected_dates)
+    """)
+
+    # Counted from message_entries rather than summed from hourly_aggregates,
+    # so a session spanning several hours counts once for the day
+    cursor.execute("""
+        INSERT INTO daily_aggregates
+        (date, year, month, day, message_count, session_count,
+         total_tokens, total_cost_usd)
+        SELECT
+            d.date,
+            MIN(e.year) as year,
+            CAST(SUBSTR(d.date, 6, 2) AS INTEGER) as month,
+            CAST(SUBSTR(d.date, 9, 2) AS INTEGER) as day,
+            COUNT(*) as message_count,
+            COUNT(DISTINCT e.session_id) as session_count,
+            SUM(e.total_tokens) as total_tokens,
+            TOTAL(e.cost_usd) as total_cost
+        FROM affected_dates d
+        JOIN message_entries e ON e.date = d.date
+        GROUP BY d.date
+    """)
+
+    cursor.execute("DELETE FROM affected_dates")
 
 
 def recompute_model_aggregates(conn: sqlite3.Connection, year: int):
@@ -174,18 +324,55 @@ def recompute_model_aggregates(conn: sqlite3.Connection, year: int):
             SUM(cache_read_tokens),
             SUM(cache_write_tokens),
             COUNT(*),
-            SUM(COALESCE(cost_usd, 0))
+            TOTAL(cost_usd)
         FROM message_entries
         WHERE year = ? AND model IS NOT NULL
         GROUP BY model, year
     """, (year,))
 
-    conn.commit()
+
+def refresh_model_aggregates_incremental(conn: sqlite3.Connection, after_rowid: int):
+    """
+    Add message entries inserted after after_rowid to the model aggregates.
+
+    SUM and COUNT are distributive, so only the new rows are scanned and their
+    per-(model, year) totals are added onto the existing aggregate rows.
+    NOT INDEXED keeps the planner on a rowid range seek; it would otherwise
+    walk all of idx_entries_year_model to avoid sorting for the GROUP BY.
+    recompute_model_aggregates remains the full rebuild.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO model_aggregates
+        (model, year, total_tokens, input_tokens, output_tokens,
+         cache_read_tokens, cache_write_tokens, message_count, total_cost_usd)
+        SELECT
+            model,
+            year,
+            SUM(total_tokens),
+            SUM(input_tokens),
+            SUM(output_tokens),
+            SUM(cache_read_tokens),
+            SUM(cache_write_tokens),
+            COUNT(*),
+            TOTAL(cost_usd)
+        FROM message_entries NOT INDEXED
+        WHERE rowid > ? AND model IS NOT NULL
+        GROUP BY model, year
+        ON CONFLICT(model, year) DO UPDATE SET
+            total_tokens = total_tokens + excluded.total_tokens,
+            input_tokens = input_tokens + excluded.input_tokens,
+            output_tokens = output_tokens + excluded.output_tokens,
+            cache_read_tokens = cache_read_tokens + excluded.cache_read_tokens,
+            cache_write_tokens = cache_write_tokens + excluded.cache_write_tokens,
+            message_count = message_count + excluded.message_count,
+            total_cost_usd = total_cost_usd + excluded.total_cost_usd
+    """, (after_rowid,))
 
 
 def query_daily_stats(conn: sqlite3.Connection, date_from: str, date_to: str, project_id: Optional[str] = None) -> dict[str, int]:
     """
-    Query daily statistics from hourly aggregates.
+    Query daily statistics from daily aggregates.
 
     Args:
         date_from: Start date (YYYY-MM-DD)
@@ -207,12 +394,11 @@ def query_daily_stats(conn: sqlite3.Connection, date_from: str, date_to: str, pr
             ORDER BY date
         """, (date_from, date_to, project_id))
     else:
-        # Use aggregates for all projects
+        # Use aggregates for all projects: one row per day, no grouping
         cursor.execute("""
-            SELECT date, SUM(message_count)
-            FROM hourly_aggregates
+            SELECT date, message_count
+            FROM daily_aggregates
             WHERE date >= ? AND date <= ?
-            GROUP BY date
             ORDER BY date
         """, (date_from, date_to))
 
@@ -235,38 +421,58 @@ def query_usage_stats(conn: sqlite3.Connection, date_from: str, date_to: str) ->
     # Daily activity
     daily_activity = query_daily_stats(conn, date_from, date_to)
 
-    # Top models (aggregate from message_entries directly for date range)
-    cursor.execute("""
-        SELECT
-            model,
-            SUM(total_tokens) as total_tokens,
-            COUNT(*) as message_count,
-            SUM(COALESCE(cost_usd, 0)) as total_cost
-        FROM message_entries
-        WHERE date >= ? AND date <= ? AND model IS NOT NULL
-        GROUP BY model
-        ORDER BY total_tokens DESC
-        LIMIT 3
-    """, (date_from, date_to))
-    top_models = [
-        {"model": row[0], "tokens": row[1], "messages": row[2], "cost": row[3]}
-        for row in cursor.fetchall()
-    ]
-
-    # Totals
-    cursor.execute("""
+    # Totals (kind 0) and top models (kind 1) in one statement. The planner may
+    # inline a plain CTE into both references and search the date range twice;
+    # MATERIALIZED (3.35+) pins a single read. Columns of a top-model row:
+    # kind, model, tokens, messages, cost.
+    cursor.execute(f"""
+        WITH entries AS {_MATERIALIZED}(
+            SELECT model, session_id, total_tokens, cost_usd,
+                   cache_read_tokens, cache_write_tokens, timestamp
+            FROM message_entries
+            WHERE date >= ? AND date <= ?
+        )
         SELECT
+            0 as kind,
             COUNT(*) as total_messages,
             COUNT(DISTINCT session_id) as total_sessions,
             SUM(total_tokens) as total_tokens,
-            SUM(COALESCE(cost_usd, 0)) as total_cost,
+            TOTAL(cost_usd) as total_cost,
             SUM(cache_read_tokens) as cache_read,
             SUM(cache_write_tokens) as cache_write,
             MIN(timestamp) as first_timestamp
-        FROM message_entries
-        WHERE date >= ? AND date <= ?
+        FROM entries
+        UNION ALL
+        SELECT * FROM (
+            SELECT
+                1,
+                model,
+                SUM(total_tokens) as total_tokens,
+                COUNT(*) as message_count,
+                TOTAL(cost_usd) as total_cost,
+                NULL, NULL, NULL
+            FROM entries
+            WHERE model IS NOT NULL
+            GROUP BY model
+            ORDER BY total_tokens DESC
+            LIMIT 3
+        )
     """, (date_from, date_to))
-    row = cursor.fetchone()
+
+    row = None
+    model_rows = []
+    for result in cursor.fetchall():
+        if result[0] == 0:
+            row = result[1:]
+        else:
+            model_rows.append(result)
+
+    # Compound SELECT output order is not guaranteed; restore tokens DESC
+    model_rows.sort(key=lambda r: r[2], reverse=True)
+    top_models = [
+        {"model": r[1], "tokens": r[2], "messages": r[3], "cost": r[4]}
+        for r in model_rows
+    ]
 
     first_timestamp = None
     if row[6]:
@@ -337,7 +543,7 @@ def query_timeline_data(
                 {group_expr_msg} as period,
                 COUNT(*) as messages,
                 SUM(total_tokens) as tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date >= ? AND date <= ? AND project_id = ?
             GROUP BY period
@@ -431,7 +637,7 @@ def query_model_distribution(
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
                 COUNT(*) as messages,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date >= ? AND date <= ? AND project_id = ? AND model IS NOT NULL
             GROUP BY model
@@ -445,7 +651,7 @@ def query_model_distribution(
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
                 COUNT(*) as messages,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date >= ? AND date <= ? AND model IS NOT NULL
             GROUP BY model
@@ -621,7 +827,7 @@ def query_recent_sessions(
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -638,7 +844,7 @@ def query_recent_sessions(
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -664,7 +870,7 @@ def query_recent_sessions(
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -680,7 +886,7 @@ def query_recent_sessions(
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -764,7 +970,7 @@ def query_totals(
                 SUM(total_tokens) as total_tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as total_cost,
+                TOTAL(cost_usd) as total_cost,
                 SUM(cache_read_tokens) as cache_read,
                 SUM(cache_write_tokens) as cache_write,
                 MIN(timestamp_local) as first_timestamp
@@ -779,7 +985,7 @@ def query_totals(
                 SUM(total_tokens) as total_tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as total_cost,
+                TOTAL(cost_usd) as total_cost,
                 SUM(cache_read_tokens) as cache_read,
                 SUM(cache_write_tokens) as cache_write,
                 MIN(timestamp_local) as first_timestamp
@@ -827,7 +1033,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 CAST(SUBSTR(timestamp_local, 12, 2) AS INTEGER) as hour,
                 COUNT(*) as message_count,
                 SUM(total_tokens) as total_tokens,
-                SUM(COALESCE(cost_usd, 0)) as total_cost_usd
+                TOTAL(cost_usd) as total_cost_usd
             FROM message_entries
             WHERE date = ? AND project_id = ?
             GROUP BY hour
@@ -854,7 +1060,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date = ? AND project_id = ? AND model IS NOT NULL
             GROUP BY model
@@ -868,7 +1074,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date = ? AND model IS NOT NULL
             GROUP BY model
@@ -896,7 +1102,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -912,7 +1118,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -945,7 +1151,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date = ? AND project_id = ?
         """, (date, project_id))
@@ -957,7 +1163,7 @@ def query_day_details(conn: sqlite3.Connection, date: str, project_id: Optional[
                 SUM(total_tokens) as tokens,
                 SUM(input_tokens) as input_tokens,
                 SUM(output_tokens) as output_tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE date = ?
         """, (date,))
@@ -1034,7 +1240,7 @@ def query_model_details(
                 SUM(output_tokens) as output_tokens,
                 SUM(cache_read_tokens) as cache_read,
                 SUM(cache_write_tokens) as cache_write,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE model = ? AND date >= ? AND date <= ? AND project_id = ?
         """, (model, date_from, date_to, project_id))
@@ -1048,7 +1254,7 @@ def query_model_details(
                 SUM(output_tokens) as output_tokens,
                 SUM(cache_read_tokens) as cache_read,
                 SUM(cache_write_tokens) as cache_write,
-                SUM(COALESCE(cost_usd, 0)) as cost
+                TOTAL(cost_usd) as cost
             FROM message_entries
             WHERE model = ? AND date >= ? AND date <= ?
         """, (model, date_from, date_to))
@@ -1061,7 +1267,7 @@ def query_model_details(
                 session_id,
                 COUNT(*) as messages,
                 SUM(total_tokens) as tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -1076,7 +1282,7 @@ def query_model_details(
                 session_id,
                 COUNT(*) as messages,
                 SUM(total_tokens) as tokens,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time
             FROM message_entries
@@ -1173,7 +1379,7 @@ def query_session_details(conn: sqlite3.Connection, session_id: str, project_id:
                 SUM(output_tokens) as output_tokens,
                 SUM(cache_read_tokens) as cache_read,
                 SUM(cache_write_tokens) as cache_write,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time,
                 MIN(date) as date
@@ -1189,7 +1395,7 @@ def query_session_details(conn: sqlite3.Connection, session_id: str, project_id:
                 SUM(output_tokens) as output_tokens,
                 SUM(cache_read_tokens) as cache_read,
                 SUM(cache_write_tokens) as cache_write,
-                SUM(COALESCE(cost_usd, 0)) as cost,
+                TOTAL(cost_usd) as cost,
                 MIN(timestamp_local) as first_time,
                 MAX(timestamp_local) as last_time,
                 MIN(date) as date
@@ -1,11 +1,12 @@
 """
 Database schema definitions and migrations
 """
-import sqlite3
 from typing import Optional
 
+from command_center.utils.sqlite_compat import sqlite3
 
-CURRENT_SCHEMA_VERSION = 3
+
+CURRENT_SCHEMA_VERSION = 6
 
 
 def get_schema_version(conn: sqlite3.Connection) -> int:
@@ -86,12 +87,12 @@ def create_message_entries_table(conn: sqlite3.Connection):
         )
     """)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_entries_year
-        ON message_entries(year)
+        CREATE INDEX IF NOT EXISTS idx_entries_year_model
+        ON message_entries(year, model)
     """)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_entries_date
-        ON message_entries(date)
+        CREATE INDEX IF NOT EXISTS idx_entries_date_hour
+        ON message_entries(date, SUBSTR(timestamp_local, 12, 2))
     """)
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_entries_session
@@ -140,6 +141,24 @@ def create_hourly_aggregates_table(conn: sqlite3.Connection):
     conn.commit()
 
 
+def create_daily_aggregates_table(conn: sqlite3.Connection):
+    """Create daily_aggregates table (per-day rollup kept next to hourly_aggregates)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_aggregates (
+            date TEXT PRIMARY KEY,
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            message_count INTEGER DEFAULT 0,
+            session_count INTEGER DEFAULT 0,
+            total_tokens INTEGER DEFAULT 0,
+            total_cost_usd REAL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.commit()
+
+
 def create_model_aggregates_table(conn: sqlite3.Connection):
     """Create model_aggregates table"""
     cursor = conn.cursor()
@@ -158,8 +177,8 @@ def create_model_aggregates_table(conn: sqlite3.Connection):
         )
     """)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_model_year
-        ON model_aggregates(year)
+        CREATE INDEX IF NOT EXISTS idx_model_agg_year_tokens
+        ON model_aggregates(year, total_tokens DESC)
     """)
     conn.commit()
 
@@ -214,6 +233,7 @@ def init_database(conn: sqlite3.Connection):
         create_file_tracks_table(conn)
         create_message_entries_table(conn)
         create_hourly_aggregates_table(conn)
+        create_daily_aggregates_table(conn)
         create_model_aggregates_table(conn)
         create_limit_events_table(conn)
         set_schema_version(conn, CURRENT_SCHEMA_VERSION)
@@ -251,6 +271,74 @@ def migrate_to_v3(conn: sqlite3.Connection):
         conn.commit()
 
 
+def migrate_to_v4(conn: sqlite3.Connection):
+    """
+    Migration to v4: Index model_aggregates by (year, total_tokens DESC).
+
+    Lets top-model queries read rows in order instead of sorting; the new
+    index has year as its prefix, so it replaces idx_model_year.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_model_agg_year_tokens
+        ON model_aggregates(year, total_tokens DESC)
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_model_year")
+    conn.commit()
+
+
+def migrate_to_v5(conn: sqlite3.Connection):
+    """
+    Migration to v5: Index message_entries by (date, hour) and (year, model).
+
+    Hourly recompute matches date and SUBSTR(timestamp_local, 12, 2), and
+    model recompute groups a year by model; both become index range scans.
+    The new indexes have date / year as their prefix, so they replace
+    idx_entries_date and idx_entries_year.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_date_hour
+        ON message_entries(date, SUBSTR(timestamp_local, 12, 2))
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_year_model
+        ON message_entries(year, model)
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_entries_date")
+    cursor.execute("DROP INDEX IF EXISTS idx_entries_year")
+    conn.commit()
+
+
+def migrate_to_v6(conn: sqlite3.Connection):
+    """
+    Migration to v6: Add daily_aggregates and fill it from message_entries.
+
+    Daily stats read one row per day instead of summing 24 hourly rows.
+    session_count is counted per day, since a session that spans several
+    hours appears in each of their hourly counts.
+    """
+    create_daily_aggregates_table(conn)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT OR REPLACE INTO daily_aggregates
+        (date, year, month, day, message_count, session_count,
+         total_tokens, total_cost_usd)
+        SELECT
+            date,
+            MIN(year),
+            CAST(SUBSTR(date, 6, 2) AS INTEGER),
+            CAST(SUBSTR(date, 9, 2) AS INTEGER),
+            COUNT(*),
+            COUNT(DISTINCT session_id),
+            SUM(total_tokens),
+            TOTAL(cost_usd)
+        FROM message_entries
+        GROUP BY date
+    """)
+    conn.commit()
+
+
 def run_migrations(conn: sqlite3.Connection, from_version: int, to_version: int):
     """
     Run database migrations from one version to another.
@@ -270,6 +358,21 @@ def run_migrations(conn: sqlite3.Connection, from_version: int, to_version: int)
         migrate_to_v3(conn)
         set_schema_version(conn, 3)
 
+    # Migration to v4: Ordered index for top models per year
+    if from_version < 4 and to_version >= 4:
+        migrate_to_v4(conn)
+        set_schema_version(conn, 4)
+
+    # Migration to v5: (date, hour) and (year, model) indexes on message_entries
+    if from_version < 5 and to_version >= 5:
+        migrate_to_v5(conn)
+        set_schema_version(conn, 5)
+
+    # Migration to v6: Per-day rollup table
+    if from_version < 6 and to_version >= 6:
+        migrate_to_v6(conn)
+        set_schema_version(conn, 6)
+
 
 def check_integrity(conn: sqlite3.Connection) -> bool:
     """
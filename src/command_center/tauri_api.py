@@ -13,13 +13,14 @@ Usage:
 import argparse
 import json
 import sys
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Literal
+from typing import Generator, Literal
 
 from command_center import __version__ as package_version
-from command_center.database.connection import get_db_connection
-from command_center.database.schema import init_database
+from command_center.database.connection import get_db_connection, get_readonly_connection_no_context
+from command_center.database.schema import CURRENT_SCHEMA_VERSION, get_schema_version, init_database
 from command_center.database.queries import (
     query_daily_stats,
     query_timeline_data,
@@ -38,6 +39,7 @@ from command_center.cache.incremental_update import perform_incremental_update
 from command_center.aggregators.streak_calculator import calculate_streaks
 from command_center.visualization.png_generator import generate_usage_report_png
 from command_center.usage_accounts import fetch_latest_usage_accounts
+from command_center.utils.sqlite_compat import sqlite3
 import base64
 
 
@@ -56,6 +58,35 @@ def calculate_trend(current: float, previous: float) -> float:
     return round(change, 1)
 
 
+@contextmanager
+def read_connection() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Connection for commands that only read.
+
+    Opens the database read-only once it exists at the current schema version;
+    before that, falls back to a read/write connection that initializes it.
+    """
+    conn = None
+    try:
+        conn = get_readonly_connection_no_context()
+        ready = get_schema_version(conn) == CURRENT_SCHEMA_VERSION
+    except sqlite3.OperationalError:
+        ready = False
+
+    if not ready:
+        if conn is not None:
+            conn.close()
+        with get_db_connection() as conn:
+            init_database(conn)
+            yield conn
+        return
+
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
 def get_app_version() -> str:
     version = package_version
     if version.endswith("-dev"):
@@ -119,12 +150,12 @@ def get_dashboard_bundle(
     Returns:
         Complete dashboard data bundle as dict
     """
-    with get_db_connection() as conn:
-        init_database(conn)
-
+    # A refresh writes before querying and needs the read/write connection
+    with (get_db_connection() if refresh else read_connection()) as conn:
         # Optionally refresh data
         updated_files = 0
         if refresh:
+            init_database(conn)
             updated_files = perform_incremental_update(conn, force_rescan=False, verbose=False)
 
         # Query all data for current period
@@ -210,8 +241,7 @@ def get_day_details(date: str, project_id: str | None = None) -> dict:
     Returns:
         Day details with hourly breakdown, models, and sessions
     """
-    with get_db_connection() as conn:
-        init_database(conn)
+    with read_connection() as conn:
         return query_day_details(conn, date, project_id)
 
 
@@ -228,8 +258,7 @@ def get_model_details(model: str, date_from: str, date_to: str, project_id: str
     Returns:
         Model details with daily activity and top sessions
     """
-    with get_db_connection() as conn:
-        init_database(conn)
+    with read_connection() as conn:
         return query_model_details(conn, model, date_from, date_to, project_id)
 
 
@@ -244,8 +273,7 @@ def get_session_details(session_id: str, project_id: str | None = None) -> dict:
     Returns:
         Session details with messages and totals
     """
-    with get_db_connection() as conn:
-        init_database(conn)
+    with read_connection() as conn:
         return query_session_details(conn, session_id, project_id)
 
 
@@ -260,8 +288,7 @@ def get_limit_resets(date_from: str, date_to: str) -> list[dict]:
     Returns:
         List of limit reset events with timestamps
     """
-    with get_db_connection() as conn:
-        init_database(conn)
+    with read_connection() as conn:
         return get_limit_events(conn, date_from, date_to)
 
 
@@ -300,9 +327,7 @@ def export_png_report(date_from: str, date_to: str) -> dict:
     Returns:
         Dict with base64-encoded PNG data and filename
     """
-    with get_db_connection() as conn:
-        init_database(conn)
-
+    with read_connection() as conn:
         # Query usage stats
         stats = query_usage_stats(conn, date_from, date_to)
 
@@ -0,0 +1,16 @@
+"""
+JSON decoding - orjson when installed, standard library json otherwise
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Both accept str or bytes; orjson.JSONDecodeError subclasses json.JSONDecodeError
+if orjson is not None:
+    json_loads = orjson.loads
+else:
+    json_loads = json.loads
@@ -5,7 +5,7 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from command_center.utils.project_helpers import reconstruct_absolute_path
 
@@ -80,15 +80,19 @@ def save_projects_json(projects: dict, json_path: str = PROJECTS_JSON_PATH):
 def auto_discover_project(
     projects: dict,
     project_id: str,
-    json_path: str = PROJECTS_JSON_PATH
+    json_path: str = PROJECTS_JSON_PATH,
+    now: Optional[str] = None
 ) -> dict:
     """
     Add new project to metadata if not exists, update last_seen if exists.
 
+    Only the in-memory dictionary is changed; callers save it.
+
     Args:
         projects: Current projects dictionary
         project_id: Project identifier to discover
         json_path: Path to projects JSON file
+        now: ISO timestamp to record (default: current local time)
 
     Returns:
         Updated projects dictionary
@@ -96,7 +100,8 @@ def auto_discover_project(
     if project_id == 'unknown':
         return projects
 
-    now = _get_local_now_iso()
+    if now is None:
+        now = _get_local_now_iso()
 
     if project_id in projects:
         # Update last_seen for existing project
@@ -117,6 +122,23 @@ def auto_discover_project(
     return projects
 
 
+def auto_discover_projects(projects: dict, project_ids: Iterable[str]) -> dict:
+    """
+    Discover several projects in memory with one shared timestamp.
+
+    Args:
+        projects: Current projects dictionary
+        project_ids: Project identifiers to discover
+
+    Returns:
+        Updated projects dictionary
+    """
+    now = _get_local_now_iso()
+    for project_id in project_ids:
+        projects = auto_discover_project(projects, project_id, now=now)
+    return projects
+
+
 def update_project_metadata(
     project_id: str,
     name: Optional[str] = None,
@@ -0,0 +1,8 @@
+"""
+SQLite driver - pysqlite3 when installed, standard library sqlite3 otherwise
+"""
+try:
+    # Same DB-API as sqlite3, linked against a recent bundled SQLite
+    import pysqlite3.dbapi2 as sqlite3
+except ImportError:
+    import sqlite3
@@ -0,0 +1,205 @@
+"""
+Unit tests for aggregate maintenance (migration, inserts, incremental refresh)
+"""
+import json
+
+import pytest
+
+from command_center.cache import incremental_update
+from command_center.database import queries
+from command_center.database.models import MessageEntry
+from command_center.utils.sqlite_compat import sqlite3
+from command_center.database.schema import (
+    create_schema_version_table, create_file_tracks_table, create_message_entries_table,
+    create_hourly_aggregates_table, create_model_aggregates_table, create_limit_events_table,
+    set_schema_version, get_schema_version, init_database, CURRENT_SCHEMA_VERSION
+)
+
+
+DAILY_FROM_ENTRIES_SQL = """
+    SELECT date, COUNT(*), COUNT(DISTINCT session_id), SUM(total_tokens), TOTAL(cost_usd)
+    FROM message_entries
+    GROUP BY date
+    ORDER BY date
+"""
+
+DAILY_AGGREGATES_SQL = """
+    SELECT date, message_count, session_count, total_tokens, total_cost_usd
+    FROM daily_aggregates
+    ORDER BY date
+"""
+
+MODEL_AGGREGATES_SQL = """
+    SELECT model, year, total_tokens, input_tokens, output_tokens,
+           cache_read_tokens, cache_write_tokens, message_count, total_cost_usd
+    FROM model_aggregates
+    ORDER BY model, year
+"""
+
+
+def make_entry(n, date="2025-01-15", hour=10, session="s1", model="claude-sonnet-4-5",
+               tokens=100, cost=0.5):
+    """Build a MessageEntry with distinct hash n"""
+    timestamp = f"{date}T{hour:02d}:00:00"
+    return MessageEntry(
+        entry_hash=f"msg{n}:req{n}",
+        timestamp=timestamp + "Z",
+        timestamp_local=timestamp,
+        year=int(date[:4]),
+        date=date,
+        session_id=session,
+        model=model,
+        cost_usd=cost,
+        input_tokens=tokens,
+        total_tokens=tokens,
+        source_file="test.jsonl",
+    )
+
+
+def jsonl_line(n, timestamp, session, tokens, cost):
+    """One assistant message line of a session transcript"""
+    return json.dumps({
+        "type": "assistant",
+        "timestamp": timestamp,
+        "sessionId": session,
+        "requestId": f"req{n}",
+        "costUSD": cost,
+        "message": {
+            "id": f"msg{n}",
+            "model": "claude-sonnet-4-5",
+            "usage": {"input_tokens": tokens, "output_tokens": 1},
+        },
+    })
+
+
+@pytest.fixture
+def conn(tmp_path):
+    connection = sqlite3.connect(tmp_path / "test.db")
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def v5_conn(conn):
+    """Database at schema v5 (no daily_aggregates) holding a few entries"""
+    create_schema_version_table(conn)
+    create_file_tracks_table(conn)
+    create_message_entries_table(conn)
+    create_hourly_aggregates_table(conn)
+    create_model_aggregates_table(conn)
+    create_limit_events_table(conn)
+    set_schema_version(conn, 5)
+    queries.insert_message_entries(conn, [
+        make_entry(1, hour=9, session="s1"),
+        make_entry(2, hour=11, session="s1", cost=None),
+        make_entry(3, hour=11, session="s2", tokens=250),
+        make_entry(4, date="2025-01-16", session="s2", cost=1.25),
+    ])
+    conn.commit()
+    return conn
+
+
+class TestDailyAggregatesMigration:
+    """Tests for the v5 -> v6 migration and later incremental updates"""
+
+    def test_migration_backfills_daily_aggregates(self, v5_conn):
+        """Backfilled rows match a GROUP BY over message_entries"""
+        init_database(v5_conn)
+
+        assert get_schema_version(v5_conn) == CURRENT_SCHEMA_VERSION
+        assert (v5_conn.execute(DAILY_AGGREGATES_SQL).fetchall()
+                == v5_conn.execute(DAILY_FROM_ENTRIES_SQL).fetchall())
+
+    def test_incremental_update_after_migration(self, v5_conn, tmp_path, monkeypatch):
+        """An incremental update keeps daily_aggregates equal to message_entries"""
+        init_database(v5_conn)
+
+        session_file = tmp_path / "projects" / "-tmp-project" / "session.jsonl"
+        session_file.parent.mkdir(parents=True)
+        session_file.write_text("\n".join([
+            jsonl_line(10, "2025-01-16T12:00:00Z", "s3", 40, 0.1),
+            jsonl_line(11, "2025-01-17T08:30:00Z", "s3", 60, None),
+            "not json",
+            '["valid json, wrong shape"]',
+        ]) + "\n")
+
+        monkeypatch.setattr(incremental_update, "scan_jsonl_files", lambda: [str(session_file)])
+        monkeypatch.setattr(incremental_update, "load_projects_json", lambda: {})
+        monkeypatch.setattr(incremental_update, "save_projects_json", lambda projects: None)
+
+        assert incremental_update.perform_incremental_update(v5_conn) == 1
+        assert v5_conn.execute("SELECT COUNT(*) FROM message_entries").fetchone()[0] == 6
+        assert (v5_conn.execute(DAILY_AGGREGATES_SQL).fetchall()
+                == v5_conn.execute(DAILY_FROM_ENTRIES_SQL).fetchall())
+
+
+class TestInsertRows:
+    """Tests for chunked multi-row inserts"""
+
+    def test_chunked_insert_keeps_first_occurrence_in_order(self, conn, monkeypatch):
+        """Chunks plus remainder insert every row once, first duplicate wins"""
+        init_database(conn)
+        # Two rows per statement, so 7 entries give 3 full chunks and 1 remainder row
+        monkeypatch.setattr(queries, "_max_variables", lambda connection: 2 * 17)
+
+        entries = [make_entry(n, tokens=n) for n in range(6)]
+        entries.append(make_entry(2, tokens=999))
+        queries.insert_message_entries(conn, entries)
+
+        rows = conn.execute(
+            "SELECT entry_hash, total_tokens FROM message_entries ORDER BY rowid"
+        ).fetchall()
+        assert rows == [(f"msg{n}:req{n}", n) for n in range(6)]
+
+    def test_chunk_size_follows_connection_limit(self, conn):
+        """A lowered host parameter limit is respected"""
+        if not hasattr(conn, "setlimit"):
+            pytest.skip("Connection.setlimit requires Python 3.11")
+        init_database(conn)
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 3 * 17)
+
+        queries.insert_message_entries(conn, [make_entry(n) for n in range(10)])
+
+        assert conn.execute("SELECT COUNT(*) FROM message_entries").fetchone()[0] == 10
+
+
+class TestModelAggregatesIncremental:
+    """Tests for refresh_model_aggregates_incremental"""
+
+    def test_matches_full_recompute(self, conn):
+        """Adding new rows onto existing totals equals a full rebuild"""
+        init_database(conn)
+        queries.insert_message_entries(conn, [
+            make_entry(1),
+            make_entry(2, model="claude-opus-4-5", cost=None),
+        ])
+        queries.recompute_model_aggregates(conn, 2025)
+        last_rowid = queries.get_max_entry_rowid(conn)
+
+        queries.insert_message_entries(conn, [
+            make_entry(3, tokens=70),
+            make_entry(4, model="claude-haiku-4-5", cost=0.01),
+            make_entry(5, date="2024-12-31", cost=None),
+            make_entry(6, model=None),
+        ])
+        queries.refresh_model_aggregates_incremental(conn, last_rowid)
+        incremental = conn.execute(MODEL_AGGREGATES_SQL).fetchall()
+
+        for year in (2024, 2025):
+            queries.recompute_model_aggregates(conn, year)
+        assert incremental == conn.execute(MODEL_AGGREGATES_SQL).fetchall()
+
+    def test_seeks_only_rows_past_after_rowid(self, conn):
+        """The refresh reads new rows by rowid range instead of walking an index"""
+        init_database(conn)
+        queries.insert_message_entries(conn, [make_entry(n) for n in range(20)])
+        statements = []
+        conn.set_trace_callback(statements.append)
+        queries.refresh_model_aggregates_incremental(conn, 10)
+        conn.set_trace_callback(None)
+
+        sql = next(s for s in statements if "INSERT INTO model_aggregates" in s)
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        assert any(step.startswith("SEARCH message_entries USING INTEGER PRIMARY KEY")
+                   for step in plan)
+        assert conn.execute("SELECT message_count FROM model_aggregates").fetchall() == [(10,)]